@@ -2,12 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import sys
 import time
+import asyncio
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 import smtplib
 from email.mime.text import MIMEText
 import ssl
@@ -16,57 +18,177 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from backend.app.core.config import Config
 from backend.app.core.logger import setup_logger
+from backend.app.core.metrics import metrics
 from backend.app.services.rss_reader import RSSReader
 from backend.app.services.news_crawler import NewsCrawler
+from backend.app.services.page_cache import PageCache
 from backend.app.services.ai_client import AIModelClient
 from backend.app.services.html_generator import HTMLGenerator
+from backend.app.services.article_record import ArticleRecord, split_markdown_blocks
+from backend.app.services.article_store import ArticleStore
+from backend.app.services.seen_index import SeenURLIndex, normalize_url
+from backend.app.services.near_duplicate import NearDuplicateDetector
+from backend.app.services.market_summarizer import MarketSummarizer
+from backend.app.services.prompt_builder import PromptBuilder
+
+SOURCE_DISPLAY_NAMES = {
+    "wsj.com": "華爾街日報",
+    "bloomberg.com": "彭博",
+    "reuters.com": "路透",
+    "cnbc.com": "CNBC",
+    "money.cnn.com": "CNN Business",
+    "edition.cnn.com": "CNN Business",
+    "cnn.com": "CNN Business",
+    "marketwatch.com": "MarketWatch",
+    "fortune.com": "財富",
+}
+
+
+ProgressCallback = Callable[[str, Dict], None]
 
 
 class AI_News_Agent:
-    def __init__(self, config: Config, logger):
+    def __init__(
+        self,
+        config: Config,
+        logger,
+        progress_callback: Optional[ProgressCallback] = None,
+    ):
         self.config = config
         self.logger = logger
-        self.rss_reader = RSSReader(config, logger)
-        self.news_crawler = NewsCrawler(config, logger)
+        # 每個步驟完成時回報結構化的進度事件（例如 API 的即時進度串流）
+        self.progress_callback = progress_callback
+        self.seen_index = (
+            SeenURLIndex(config, logger) if config.SEEN_INDEX_ENABLED else None
+        )
+        self.rss_reader = RSSReader(config, logger, seen_index=self.seen_index)
+        self.page_cache = (
+            PageCache(config, logger) if config.PAGE_CACHE_ENABLED else None
+        )
+        self.news_crawler = NewsCrawler(config, logger, page_cache=self.page_cache)
         self.ai_client = AIModelClient(config, logger)
+        self.prompt_builder = PromptBuilder(config, logger)
+        self.market_summarizer = MarketSummarizer(config, logger, self.ai_client)
+        self.duplicate_detector = NearDuplicateDetector(config, logger)
         self.html_generator = HTMLGenerator(config, logger)
+        self.article_store = (
+            ArticleStore(config, logger) if config.ARTICLE_STORE_ENABLED else None
+        )
         self.all_models_failed = False
+        self.analyzed_articles: List[Dict] = []
 
-    def run(self, topic: str) -> bool:
+    def run(self, topic: str, resume: bool = False) -> bool:
         process_start_time = time.time()
         self.logger.info(f"🚀 === 開始執行 AI News 分析: {topic} === 🚀")
+        metrics.reset()
+        succeeded = False
+        self._emit("started", topic=topic)
         try:
-            rss_items = self.rss_reader.fetch_all_rss()
+            with metrics.span("pipeline_stage", stage="discovery"):
+                rss_items = self._discover_articles()
+            metrics.incr("articles_total", len(rss_items), stage="discovered")
+            self._emit("discovered", count=len(rss_items))
             if not rss_items:
+                if self.rss_reader.skipped_seen:
+                    # 重跑時新聞都已在先前報告處理過，屬於正常情況
+                    self.logger.info(
+                        f"🗂️ 沒有新的新聞（{self.rss_reader.skipped_seen} 則先前已處理過），本次不需更新報告"
+                    )
+                    succeeded = True
+                    return True
                 self.logger.warning("未獲取到任何 RSS 新聞")
                 self._send_failure_notification("未獲取到任何 RSS 新聞")
                 return False
 
-            articles_with_content = self.news_crawler.scrape_articles_concurrently(
-                rss_items
-            )
-            if not articles_with_content:
+            # 當日已保存的分析結果，本次新分析的新聞合併進去，報告才不會只剩這次的新聞
+            earlier_parts = self._load_completed_parts(topic, latest_fallback=resume)
+            completed_parts = earlier_parts if resume else {}
+            if completed_parts:
+                rss_items = [
+                    item
+                    for item in rss_items
+                    if normalize_url(item["url"]) not in completed_parts
+                ]
+                if self.config.MAX_TOTAL_ARTICLES > 0:
+                    remaining = self.config.MAX_TOTAL_ARTICLES - len(completed_parts)
+                    rss_items = rss_items[: max(0, remaining)]
+                self.logger.info(
+                    f"♻️ 續跑模式: 已完成 {len(completed_parts)} 篇，剩餘 {len(rss_items)} 篇待處理"
+                )
+
+            with metrics.span("pipeline_stage", stage="crawl"):
+                articles_with_content = (
+                    self.news_crawler.scrape_articles_concurrently(
+                        rss_items, on_article=self._on_article_crawled
+                    )
+                    if rss_items
+                    else []
+                )
+            crawled_count = len(articles_with_content)
+            metrics.incr("articles_total", crawled_count, stage="crawled")
+            self._emit("crawled", count=crawled_count)
+            with metrics.span("pipeline_stage", stage="dedupe"):
+                if self.seen_index:
+                    # 同一則報導換了網址時，以內容雜湊判斷是否已處理過
+                    articles_with_content = [
+                        article
+                        for article in articles_with_content
+                        if not self.seen_index.has_content(article["content"])
+                    ]
+                if self.config.NEAR_DUP_ENABLED:
+                    articles_with_content = self.duplicate_detector.deduplicate(
+                        articles_with_content
+                    )
+            if not articles_with_content and not completed_parts:
+                if crawled_count:
+                    # 爬到的內容都已在先前報告處理過（只是換了網址）
+                    self.logger.info("🗂️ 沒有新的新聞內容，本次不需更新報告")
+                    succeeded = True
+                    return True
                 self.logger.warning("未爬取到任何新聞內容")
                 self._send_failure_notification("未爬取到任何新聞內容")
                 return False
 
-            markdown_report = self._generate_markdown_report_sequentially(
-                articles_with_content, topic
-            )
-            if not markdown_report:
+            merged_parts = dict(earlier_parts)
+            if articles_with_content:
+                with metrics.span("pipeline_stage", stage="analysis"):
+                    analyzed = self._analyze_articles_concurrently(
+                        articles_with_content,
+                        topic,
+                        start_index=len(earlier_parts) + 1,
+                    )
+                metrics.incr("articles_total", len(analyzed), stage="analyzed")
+                for record in analyzed:
+                    # 同一網址重新分析時以新的結果為準
+                    merged_parts[normalize_url(record.url)] = record
+            records = list(merged_parts.values())
+            if earlier_parts and not resume:
+                self.logger.info(
+                    f"🧷 合併當日先前的 {len(earlier_parts)} 篇分析，報告共 {len(records)} 篇"
+                )
+            if not records:
                 self.logger.error("所有新聞分析失敗")
                 self._send_failure_notification("所有 AI Model 分析失敗")
                 return False
 
+            markdown_report = "\n\n".join(record.markdown for record in records)
             self._save_markdown_report(markdown_report, topic)
-
-            market_summary_md = self._generate_market_summary(markdown_report)
-
-            self.html_generator.parse_and_render_html(
-                markdown_report, market_summary_md, topic
-            )
-
+            if self.article_store:
+                stored = self.article_store.upsert(records, topic)
+                self.logger.info(f"🗃️ 已寫入 {stored} 則新聞到新聞資料庫")
+
+            with metrics.span("pipeline_stage", stage="summary"):
+                market_summary_md = self._generate_market_summary(records)
+
+            with metrics.span("pipeline_stage", stage="render"):
+                rendered = self.html_generator.render_records(
+                    records, market_summary_md, topic
+                )
+            self._emit("rendered", succeeded=rendered, articles=len(records))
+            if rendered:
+                self._mark_processed(earlier_parts)
             self.logger.info("✅ 分析完成!")
+            succeeded = True
             return True
 
         except Exception as e:
@@ -74,86 +196,167 @@ class AI_News_Agent:
             self._send_failure_notification(f"分析過程發生錯誤: {e}")
             return False
         finally:
+            self.ai_client.close()
             elapsed_time = time.time() - process_start_time
+            metrics.observe("pipeline_run", elapsed_time)
+            self._write_metrics_report(topic, succeeded)
+            self._emit("finished", succeeded=succeeded, elapsed=round(elapsed_time, 2))
             self.logger.info(f"⏱️ 總耗時: {elapsed_time:.2f} 秒")
             self.logger.info("🏁 ===== AI News 分析系統執行完畢 ===== 🏁")
 
-    def _generate_markdown_report_sequentially(self, articles, topic: str) -> str:
-        self.logger.info(f"--- [步驟 3/6] 正在逐一分析新聞（共 {len(articles)} 篇）...")
-        source_map = {
-            "wsj.com": "華爾街日報",
-            "bloomberg.com": "彭博",
-            "reuters.com": "路透",
-            "cnbc.com": "CNBC",
-            "money.cnn.com": "CNN Business",
-            "edition.cnn.com": "CNN Business",
-            "cnn.com": "CNN Business",
-            "marketwatch.com": "MarketWatch",
-            "fortune.com": "財富",
-        }
-        all_markdown_parts = []
-
-        for i, article in enumerate(articles, 1):
-            display_name = article.get("source_name") or source_map.get(
-                article["source_domain"], article["source_domain"]
+    def _write_metrics_report(self, topic: str, succeeded: bool):
+        try:
+            path = metrics.write_report(
+                self.config.MARKDOWN_LOG_OUTPUT_PATH / "metrics",
+                extra={"topic": topic, "succeeded": succeeded},
             )
+            self.logger.info(f"📊 執行指標已輸出: {path}")
+        except Exception as e:
+            self.logger.warning(f"輸出執行指標時發生錯誤: {e}")
 
-            single_article_md = self.config.RAW_NEWS_MARKDOWN_TEMPLATE.format(
-                title=article["title"],
-                source_display_name=display_name,
-                url=article["url"],
-                content=article["content"],
-            )
+    def _emit(self, event: str, **data) -> None:
+        """回報進度事件；回報失敗不影響分析流程"""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(event, data)
+        except Exception as e:
+            self.logger.debug(f"回報進度事件 {event} 失敗: {e}")
+
+    def _on_article_crawled(
+        self, item: Dict, article: Optional[Dict], completed: int, total: int
+    ) -> None:
+        self._emit(
+            "article_crawled",
+            url=item.get("url", ""),
+            title=item.get("title", ""),
+            succeeded=article is not None,
+            completed=completed,
+            total=total,
+        )
 
-            # 使用單篇文章分析提示詞
-            full_prompt = self.config.SINGLE_ARTICLE_ANALYSIS_PROMPT.format(
-                news_content=single_article_md
-            )
+    def _discover_articles(self) -> List[Dict]:
+        """離線模式重播上次保存的新聞列表，否則重新獲取並保存快照"""
+        if self.config.PAGE_CACHE_OFFLINE and self.page_cache:
+            rss_items = self.page_cache.load_discovery()
+            self.logger.info(f"🗄️ 離線模式: 重播上次的新聞列表,共 {len(rss_items)} 則")
+            return rss_items
+        rss_items = self.rss_reader.fetch_all_rss()
+        if rss_items and self.page_cache:
+            self.page_cache.save_discovery(rss_items)
+        return rss_items
+
+    def _analyze_articles_concurrently(
+        self, articles, topic: str, start_index: int = 1
+    ) -> List[ArticleRecord]:
+        return asyncio.run(self._analyze_articles(articles, topic, start_index))
+
+    async def _analyze_articles(
+        self, articles, topic: str, start_index: int = 1
+    ) -> List[ArticleRecord]:
+        max_in_flight = max(1, self.config.ANALYSIS_MAX_CONCURRENCY)
+        self.logger.info(
+            f"--- [步驟 3/6] 正在分析新聞（共 {len(articles)} 篇，同時 {max_in_flight} 篇）..."
+        )
+        # 續跑時編號接續已完成的篇數，避免重寫 Markdown 標題
+        total = start_index - 1 + len(articles)
+        self.analyzed_articles = []
+        semaphore = asyncio.Semaphore(max_in_flight)
+        records: List[ArticleRecord] = []
+        finished = {}
+        next_to_save = start_index
+
+        async def analyze(i, article):
+            async with semaphore:
+                try:
+                    return i, await self._analyze_single_article(article, i, total)
+                except Exception as e:
+                    self.logger.error(f"第 {i} 篇新聞分析發生錯誤: {e}")
+                    return i, None
 
-            self.logger.info(
-                f"--- [步驟 4.{i}/6] 正在分析第 {i}/{len(articles)} 篇新聞..."
-            )
-            self.logger.info(
-                f"📰 標題: {article['title'][:80]}{'...' if len(article['title']) > 80 else ''}"
-            )
-            self.logger.info(f"📍 來源: {display_name} ({article['source_domain']})")
+        try:
+            tasks = [
+                analyze(i, article) for i, article in enumerate(articles, start_index)
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                i, analyzed_part = await next_done
+                finished[i] = analyzed_part
+
+                # 依文章順序寫入 Markdown，未完成的前序文章會擋住後續寫入
+                while next_to_save in finished:
+                    analyzed_part = finished.pop(next_to_save)
+                    if analyzed_part:
+                        article = articles[next_to_save - start_index]
+                        record = ArticleRecord.from_markdown(
+                            analyzed_part, article, self._display_name(article)
+                        )
+                        records.append(record)
+                        self.analyzed_articles.append(article)
+                        self._save_markdown_part(
+                            record.markdown, topic, next_to_save, total
+                        )
+                        self.logger.info(
+                            f"✅ 第 {next_to_save}/{total} 篇新聞分析完成並已保存"
+                        )
+                        self._emit(
+                            "article_analyzed",
+                            index=next_to_save,
+                            total=total,
+                            title=record.title,
+                            url=record.url,
+                            source=record.source,
+                        )
+                    next_to_save += 1
+        finally:
+            await self.ai_client.aclose()
+            self.prompt_builder.log_stats()
 
-            analyzed_part = self.ai_client.call(
-                full_prompt, self.config.ANALYSIS_OUTPUT_MODEL
-            )
+        if not records:
+            self.logger.error("所有新聞分析失敗")
 
-            if not analyzed_part:
-                self.logger.warning(f"第 {i} 篇新聞分析失敗,跳過")
-                continue
+        return records
+
+    async def _analyze_single_article(
+        self, article, i: int, total: int
+    ) -> Optional[str]:
+        display_name = self._display_name(article)
 
-            analyzed_part = self._clean_control_characters(analyzed_part)
-            all_markdown_parts.append(analyzed_part)
+        self.logger.info(f"--- [步驟 4.{i}/6] 正在分析第 {i}/{total} 篇新聞...")
+        self.logger.info(
+            f"📰 標題: {article['title'][:80]}{'...' if len(article['title']) > 80 else ''}"
+        )
+        self.logger.info(f"📍 來源: {display_name} ({article['source_domain']})")
 
-            self._save_markdown_part(analyzed_part, topic, i, len(articles))
-            self.logger.info(f"✅ 第 {i}/{len(articles)} 篇新聞分析完成並已保存")
+        # 使用單篇文章分析提示詞，內容依實際使用的模型的 token 預算精簡
+        prompts: Dict[str, str] = {}
 
-        if not all_markdown_parts:
-            self.logger.error("所有新聞分析失敗")
-            return ""
+        def prompt_for(model: str) -> str:
+            if model not in prompts:
+                prompts[model] = self.prompt_builder.build_article_prompt(
+                    article, display_name, model
+                )
+            return prompts[model]
 
-        return "\n\n".join(all_markdown_parts)
+        analyzed_part = await self.ai_client.acall(
+            prompt_for, self.config.ANALYSIS_OUTPUT_MODEL, expected_prefix="## "
+        )
+
+        if not analyzed_part:
+            self.logger.warning(f"第 {i} 篇新聞分析失敗,跳過")
+            return None
+
+        return self._clean_control_characters(analyzed_part)
+
+    def _display_name(self, article: Dict) -> str:
+        return article.get("source_name") or SOURCE_DISPLAY_NAMES.get(
+            article["source_domain"], article["source_domain"]
+        )
 
     def _generate_markdown_report(self, articles) -> Optional[str]:
         self.logger.info(f"--- [步驟 3/6] 正在將新聞內容發送給 AI 進行分析...")
-        source_map = {
-            "wsj.com": "華爾街日報",
-            "bloomberg.com": "彭博",
-            "reuters.com": "路透",
-            "cnbc.com": "CNBC",
-            "money.cnn.com": "CNN Business",
-            "edition.cnn.com": "CNN Business",
-            "cnn.com": "CNN Business",
-            "marketwatch.com": "MarketWatch",
-            "fortune.com": "財富",
-        }
         raw_news_md = ""
         for article in articles:
-            display_name = article.get("source_name") or source_map.get(
+            display_name = article.get("source_name") or SOURCE_DISPLAY_NAMES.get(
                 article["source_domain"], article["source_domain"]
             )
             raw_news_md += self.config.RAW_NEWS_MARKDOWN_TEMPLATE.format(
@@ -179,18 +382,73 @@ class AI_News_Agent:
 
         return self._clean_control_characters(markdown_report)
 
+    def _mark_processed(self, completed_parts: Dict[str, ArticleRecord]):
+        """報告產生後才記錄已處理的新聞，失敗的執行重跑時不會漏掉文章"""
+        if not self.seen_index:
+            return
+        for article in self.analyzed_articles:
+            self.seen_index.mark(article["url"], article["content"])
+            for alternate in article.get("alternates", []):
+                self.seen_index.mark(alternate["url"])
+        for url_key in completed_parts:
+            self.seen_index.mark(url_key)
+        self.logger.info(
+            f"🗂️ 已記錄 {len(self.analyzed_articles) + len(completed_parts)} 則已處理新聞"
+        )
+
+    def _markdown_report_path(self, topic: str) -> Path:
+        topic_slug = (
+            "".join(c for c in topic if c.isalnum() or c in " -")
+            .rstrip()
+            .replace(" ", "_")
+        )
+        filename = self.config.MARKDOWN_FILENAME_TEMPLATE.format(
+            date=datetime.now().strftime("%Y%m%d"), topic_slug=topic_slug[:30]
+        )
+        return self.config.MARKDOWN_LOG_OUTPUT_PATH / filename
+
+    def _load_completed_parts(
+        self, topic: str, latest_fallback: bool = True
+    ) -> Dict[str, ArticleRecord]:
+        """讀回當日已保存的 Markdown 報告，回傳 {正規化來源 URL: 文章紀錄}
+
+        latest_fallback 為 True 時（續跑），找不到同主題的報告就改讀當日最新的報告
+        """
+        path = self._markdown_report_path(topic)
+        if not path.exists():
+            if not latest_fallback:
+                return {}
+            pattern = self.config.MARKDOWN_FILENAME_TEMPLATE.format(
+                date=datetime.now().strftime("%Y%m%d"), topic_slug="*"
+            )
+            candidates = sorted(
+                self.config.MARKDOWN_LOG_OUTPUT_PATH.glob(pattern),
+                key=lambda p: p.stat().st_mtime,
+            )
+            if not candidates:
+                self.logger.info("續跑模式: 找不到當日的 Markdown 報告，將完整執行")
+                return {}
+            path = candidates[-1]
+
+        try:
+            text = path.read_text(encoding="utf-8").replace("\r\n", "\n")
+        except Exception as e:
+            self.logger.error(f"讀取已保存的 Markdown 報告時發生錯誤: {e}")
+            return {}
+
+        completed: Dict[str, ArticleRecord] = {}
+        for block in split_markdown_blocks(text):
+            record = ArticleRecord.from_markdown(block)
+            if record is None:
+                continue
+            completed.setdefault(normalize_url(record.url), record)
+        self.logger.info(f"從 {path} 讀回 {len(completed)} 篇已完成的新聞分析")
+        return completed
+
     def _save_markdown_report(self, markdown_content: str, topic: str):
         self.logger.info(f"--- [步驟] 保存 Markdown 報告...")
         try:
-            topic_slug = (
-                "".join(c for c in topic if c.isalnum() or c in " -")
-                .rstrip()
-                .replace(" ", "_")
-            )
-            filename = self.config.MARKDOWN_FILENAME_TEMPLATE.format(
-                date=datetime.now().strftime("%Y%m%d"), topic_slug=topic_slug[:30]
-            )
-            path = self.config.MARKDOWN_LOG_OUTPUT_PATH / filename
+            path = self._markdown_report_path(topic)
             path.write_text(markdown_content, encoding="utf-8")
             self.logger.info(f"Markdown 報告已保存: {path}")
         except Exception as e:
@@ -200,15 +458,7 @@ class AI_News_Agent:
         self, markdown_part: str, topic: str, part_num: int, total_parts: int
     ):
         try:
-            topic_slug = (
-                "".join(c for c in topic if c.isalnum() or c in " -")
-                .rstrip()
-                .replace(" ", "_")
-            )
-            filename = self.config.MARKDOWN_FILENAME_TEMPLATE.format(
-                date=datetime.now().strftime("%Y%m%d"), topic_slug=topic_slug[:30]
-            )
-            path = self.config.MARKDOWN_LOG_OUTPUT_PATH / filename
+            path = self._markdown_report_path(topic)
 
             # 如果是新文件，寫入標題
             if part_num == 1 or not path.exists():
@@ -225,24 +475,24 @@ class AI_News_Agent:
         except Exception as e:
             self.logger.error(f"保存第 {part_num} 篇新聞時發生錯誤: {e}")
 
-    def _generate_market_summary(self, analyzed_markdown: str) -> str:
+    def _generate_market_summary(self, records: List[ArticleRecord]) -> str:
         self.logger.info(f"--- [步驟 5/6] 正在生成市場總評...")
-        summary_prompt = self.config.SUMMARY_PROMPT_TEMPLATE.format(
-            analyzed_markdown=analyzed_markdown
-        )
-        market_summary_md = self.ai_client.call(
-            summary_prompt, self.config.SUMMARY_GENERATION_MODEL
-        )
+        market_summary_md = asyncio.run(self._summarize_market(records))
+        self._emit("summarized", succeeded=bool(market_summary_md))
         if not market_summary_md:
             self.logger.warning("市場總評生成失敗,將使用默認內容")
             return "市場總評生成失敗，請稍後再試。"
         return self._clean_control_characters(market_summary_md or "")
 
+    async def _summarize_market(self, records: List[ArticleRecord]) -> Optional[str]:
+        try:
+            return await self.market_summarizer.summarize(records)
+        finally:
+            await self.ai_client.aclose()
+
     def _clean_control_characters(self, text: str) -> str:
         if not text:
             return ""
-        import re
-
         return re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]", "", text)
 
     def _send_failure_notification(self, error_message: str):
@@ -298,6 +548,26 @@ def main():
         default="INFO",
         help="日誌輸出級別",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="從當日已保存的 Markdown 報告續跑，只處理尚未完成的新聞",
+    )
+    parser.add_argument(
+        "--include-seen",
+        action="store_true",
+        help="停用已處理新聞索引（不略過、也不記錄先前報告處理過的新聞）",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="停用 LLM 回應快取，強制重新呼叫 AI 模型",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="離線重播：使用上次保存的新聞列表與網頁快取重新擷取內容，不下載網頁",
+    )
     parser.add_argument(
         "--version", action="version", version="AI News Analysis System v1.0.0"
     )
@@ -313,13 +583,25 @@ def main():
     if args.output:
         config_instance.HTML_OUTPUT_PATH = Path(args.output)
 
+    if args.no_cache:
+        config_instance.LLM_CACHE_ENABLED = False
+
+    if args.include_seen:
+        config_instance.SEEN_INDEX_ENABLED = False
+
+    if args.offline:
+        config_instance.PAGE_CACHE_ENABLED = True
+        config_instance.PAGE_CACHE_OFFLINE = True
+        # 重播的是已處理過的新聞，不能被已處理索引略過
+        config_instance.SEEN_INDEX_ENABLED = False
+
     logger_instance = setup_logger(
         config_instance.MARKDOWN_LOG_OUTPUT_PATH, config_instance.LOG_FILENAME
     )
     logger_instance.setLevel(getattr(__import__("logging"), args.log_level))
 
     agent = AI_News_Agent(config_instance, logger_instance)
-    success = agent.run(topic=args.topic)
+    success = agent.run(topic=args.topic, resume=args.resume)
 
     sys.exit(0 if success else 1)
 
@@ -30,6 +30,31 @@ class Config:
     OPENROUTER_MAX_TOKENS: int = 8192
     OPENROUTER_MAX_RETRIES: int = 3
     OPENROUTER_BASE_DELAY: int = 5
+    OPENROUTER_POOL_SIZE: int = 10
+    OPENROUTER_STREAM: bool = os.getenv("OPENROUTER_STREAM", "false").lower() == "true"
+    OPENROUTER_STREAM_IDLE_TIMEOUT: int = 60
+    OPENROUTER_STREAM_FIRST_TOKEN_TIMEOUT: int = 120
+    STREAM_VALIDATION_CHARS: int = 200
+    MODEL_HEALTH_WINDOW: int = 50
+    RATE_LIMITS: Dict[str, float] = field(
+        default_factory=lambda: {
+            "openrouter.ai": 1.0,
+            "api.tavily.com": 2.0,
+        }
+    )
+    DEFAULT_HOST_RATE: float = 5.0
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_MIN_RATE: float = 0.1
+    RATE_LIMIT_RECOVERY_STEP: float = 0.1
+    MODEL_RATE_LIMIT_COOLDOWN: int = 120
+    MODEL_ERROR_COOLDOWN: int = 30
+    PROMPT_INPUT_TOKEN_BUDGET: int = int(
+        os.getenv("PROMPT_INPUT_TOKEN_BUDGET", "12000")
+    )
+    DEFAULT_MODEL_CONTEXT_TOKENS: int = 32768
+    MODEL_CONTEXT_TOKENS: Dict[str, int] = field(default_factory=dict)
+    DEFAULT_CHARS_PER_TOKEN: float = 4.0
+    MODEL_CHARS_PER_TOKEN: Dict[str, float] = field(default_factory=dict)
     WAYBACK_API_URL: str = "https://archive.org/wayback/available?url="
     CNN_BUSINESS_HOME_URL: str = "https://edition.cnn.com/business"
     RSS_REQUEST_HEADERS: Dict[str, str] = field(
@@ -47,6 +72,7 @@ class Config:
             "https://www.cnbc.com/id/100727362/device/rss/rss.html",
         ]
     )
+    RSS_CONDITIONAL_GET: bool = True
     REUTERS_BUSINESS_RSS_URLS: List[str] = field(default_factory=lambda: [])
     BLOOMBERG_RSS_URLS: List[str] = field(
         default_factory=lambda: [
@@ -86,15 +112,52 @@ class Config:
     MAX_SEARCH_RESULTS: int = 50
     ARTICLE_MIN_LENGTH: int = 250
     SCRAPE_TIMEOUT: int = 20
+    DISCOVERY_DEADLINE: int = 45
     MAX_WORKERS: int = 10
+    CRAWL_PER_DOMAIN_CONCURRENCY: int = 4
+    CRAWL4AI_MAX_PAGES: int = 5
+    CRAWL_STRATEGY_WINDOW: int = 30
+    CRAWL_STRATEGY_MIN_SAMPLES: int = 3
+    CRAWL_STRATEGY_SKIP_AFTER: int = 5
+    CRAWL_STRATEGY_STATS_TTL_DAYS: int = 7
+    ANALYSIS_MAX_CONCURRENCY: int = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+    SUMMARY_BATCH_SIZE: int = 8
+    SUMMARY_MAX_INPUT_CHARS: int = 12000
+    SUMMARY_ARTICLE_MAX_CHARS: int = 1500
     MARKDOWN_LOG_OUTPUT_PATH: Path = Path(
         os.getenv("MARKDOWN_LOG_OUTPUT_PATH", "./financial_reports")
     )
     HTML_OUTPUT_PATH: Path = Path(os.getenv("HTML_OUTPUT_PATH", "./output"))
     HTML_FILENAME: str = "index.html"
+    REPORT_CACHE_CHECK_INTERVAL: float = 1.0
+    JOB_MAX_WORKERS: int = 1
+    JOB_HISTORY_LIMIT: int = 50
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    CACHE_DIR: Path = Path(os.getenv("CACHE_DIR", "./financial_reports/.cache"))
+    ARTICLE_STORE_ENABLED: bool = True
+    ARTICLE_DB_PATH: Path = Path(
+        os.getenv("ARTICLE_DB_PATH", "./financial_reports/articles.sqlite3")
+    )
+    NEAR_DUP_ENABLED: bool = True
+    NEAR_DUP_THRESHOLD: float = 0.5
+    NEAR_DUP_NUM_PERM: int = 64
+    NEAR_DUP_SHINGLE_SIZE: int = 5
+    NEAR_DUP_MAX_WORDS: int = 800
+    SEEN_INDEX_ENABLED: bool = True
+    SEEN_URL_RETENTION_DAYS: int = 3
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_HOURS: int = 24
+    LLM_CACHE_MAX_MB: int = 50
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_OFFLINE: bool = False
+    PAGE_CACHE_TTL_HOURS: int = int(os.getenv("PAGE_CACHE_TTL_HOURS", "12"))
+    PAGE_CACHE_RETENTION_DAYS: int = 7
     MARKDOWN_FILENAME_TEMPLATE: str = "美國財經新聞分析_{date}_{topic_slug}.md"
     LOG_FILENAME: str = "ai_news_analyzer.log"
     JINJA_TEMPLATE_FILE: str = "template.html"
+    ARTICLE_FRAGMENT_TEMPLATE_FILE: str = "article_fragment.html"
+    HTML_FRAGMENT_CACHE_ENABLED: bool = True
+    HTML_FRAGMENT_RETENTION_DAYS: int = 7
     SINGLE_ARTICLE_ANALYSIS_PROMPT: str = (
         "您是一位具有20年工作經驗的金融分析師，專精美國財經市場並熟悉台灣的投資環境。請根據以下提供的 **英文原文** 新聞：\n\n"
         "--- START OF NEWS ARTICLE ---\n\n{news_content}\n\n--- END OF NEWS ARTICLE ---\n\n"
@@ -144,8 +207,26 @@ class Config:
         "- **直接輸出**：請直接輸出總評內容，不要包含任何額外的標題或引言。確保所有文字輸出均為 **台灣繁體中文**。\n\n"
         "--- START OF ANALYZED NEWS ---\n\n{analyzed_markdown}\n\n--- END OF ANALYZED NEWS ---"
     )
+    SUMMARY_BATCH_PROMPT_TEMPLATE: str = (
+        "您是一位具有20年工作經驗的資深財經專家。以下是今日部分財經新聞的翻譯摘要與單篇評論。\n\n"
+        "請整理出這批新聞的 **重點摘要**：\n"
+        "- 以 3-6 個條列重點呈現，每點一到兩句。\n"
+        "- 聚焦對市場、產業與投資人的影響，合併相同主題的新聞。\n"
+        "- **直接輸出**：請直接輸出條列重點，不要包含任何額外的標題或引言。確保所有文字輸出均為 **台灣繁體中文**。\n\n"
+        "--- START OF NEWS ---\n\n{analyzed_markdown}\n\n--- END OF NEWS ---"
+    )
+    SUMMARY_REDUCE_PROMPT_TEMPLATE: str = (
+        "您是一位具有20年工作經驗的資深財經專家。以下是今日財經新聞分批整理出的重點摘要。請基於這些重點，撰寫一段約200-300字的 **『本日市場總評』**。\n\n"
+        "這段總評需要：\n"
+        "- **宏觀視角**：整合所有批次的觀點，而不僅是重複單篇重點。\n"
+        "- **深入獨到**：提出對未來市場趨勢的綜合性、前瞻性看法。\n"
+        "- **專業語言**：使用台灣投資人熟悉的金融術語。\n"
+        "- **直接輸出**：請直接輸出總評內容，不要包含任何額外的標題或引言。確保所有文字輸出均為 **台灣繁體中文**。\n\n"
+        "--- START OF KEY POINTS ---\n\n{partial_summaries}\n\n--- END OF KEY POINTS ---"
+    )
     HOSTNAME: str = socket.gethostname()
 
     def __post_init__(self):
         self.MARKDOWN_LOG_OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
         self.HTML_OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+        self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,202 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 每組標籤最多保留的耗時樣本數，用於計算百分位數
+_MAX_SAMPLES = 1000
+_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Metrics:
+    """行程內的輕量指標：span／observe 記錄耗時分佈，incr 記錄次數"""
+
+    def __init__(self, namespace: str = "ainews"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[LabelKey, Dict]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.started_at = time.time()
+
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = self._label_key(labels)
+        with self._lock:
+            stats = self._timings.setdefault(name, {}).get(key)
+            if stats is None:
+                stats = {"count": 0, "sum": 0.0, "max": 0.0, "samples": []}
+                self._timings[name][key] = stats
+            stats["count"] += 1
+            stats["sum"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            if len(stats["samples"]) < _MAX_SAMPLES:
+                stats["samples"].append(seconds)
+            else:
+                stats["samples"][stats["count"] % _MAX_SAMPLES] = seconds
+
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        key = self._label_key(labels)
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def export_state(self) -> Dict:
+        """輸出原始統計（含耗時樣本），供其他行程以 merge 合併"""
+        with self._lock:
+            return {
+                "timings": {
+                    name: [
+                        (list(key), {**stats, "samples": list(stats["samples"])})
+                        for key, stats in series.items()
+                    ]
+                    for name, series in self._timings.items()
+                },
+                "counters": {
+                    name: [(list(key), value) for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def merge(self, state: Dict) -> None:
+        """合併 export_state 的結果：次數與耗時累加，樣本只保留最新的 _MAX_SAMPLES 筆"""
+        with self._lock:
+            for name, series in state.get("timings", {}).items():
+                for key, incoming in series:
+                    key = tuple(tuple(pair) for pair in key)
+                    stats = self._timings.setdefault(name, {}).get(key)
+                    if stats is None:
+                        stats = {"count": 0, "sum": 0.0, "max": 0.0, "samples": []}
+                        self._timings[name][key] = stats
+                    stats["count"] += incoming["count"]
+                    stats["sum"] += incoming["sum"]
+                    stats["max"] = max(stats["max"], incoming["max"])
+                    stats["samples"] = (stats["samples"] + incoming["samples"])[
+                        -_MAX_SAMPLES:
+                    ]
+            for name, series in state.get("counters", {}).items():
+                counters = self._counters.setdefault(name, {})
+                for key, value in series:
+                    key = tuple(tuple(pair) for pair in key)
+                    counters[key] = counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            timings = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": stats["count"],
+                        "sum": round(stats["sum"], 4),
+                        "avg": round(stats["sum"] / stats["count"], 4),
+                        "max": round(stats["max"], 4),
+                        **{
+                            f"p{int(q * 100)}": round(
+                                self._quantile(stats["samples"], q), 4
+                            )
+                            for q in _QUANTILES
+                        },
+                    }
+                    for key, stats in series.items()
+                ]
+                for name, series in self._timings.items()
+            }
+            counters = {
+                name: [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self._counters.items()
+            }
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "generated_at": datetime.now().isoformat(),
+            "timings": timings,
+            "counters": counters,
+        }
+
+    def write_report(
+        self, directory: Path, extra: Optional[Dict] = None, keep: int = 30
+    ) -> Path:
+        """輸出 JSON 執行報告，只保留最近 keep 份"""
+        directory.mkdir(parents=True, exist_ok=True)
+        report = {**(extra or {}), **self.snapshot()}
+        path = directory / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        for old_report in sorted(directory.glob("run_*.json"))[:-keep]:
+            old_report.unlink(missing_ok=True)
+        return path
+
+    def prometheus_text(self) -> str:
+        """Prometheus 文字格式：耗時輸出為 summary，次數輸出為 counter"""
+        lines: List[str] = []
+        snapshot = self.snapshot()
+        for name, series in sorted(snapshot["timings"].items()):
+            metric = f"{self.namespace}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for entry in series:
+                labels = entry["labels"]
+                for q in _QUANTILES:
+                    quantile_labels = {**labels, "quantile": str(q)}
+                    lines.append(
+                        f"{metric}{self._format_labels(quantile_labels)} "
+                        f"{entry[f'p{int(q * 100)}']}"
+                    )
+                lines.append(
+                    f"{metric}_sum{self._format_labels(labels)} {entry['sum']}"
+                )
+                lines.append(
+                    f"{metric}_count{self._format_labels(labels)} {entry['count']}"
+                )
+        for name, series in sorted(snapshot["counters"].items()):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for entry in series:
+                lines.append(
+                    f"{metric}{self._format_labels(entry['labels'])} {entry['value']}"
+                )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _label_key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _quantile(samples: List[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        pairs = []
+        for key, value in labels.items():
+            value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            pairs.append(f'{key}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+
+# 整個行程共用的指標
+metrics = Metrics()
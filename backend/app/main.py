@@ -1,7 +1,16 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from typing import Optional
+import json
+import asyncio
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -11,21 +20,36 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.app.core.config import Config
 from backend.app.core.logger import setup_logger
+from backend.app.core.metrics import metrics
 from backend.app.services.rss_reader import RSSReader
 from backend.app.services.news_crawler import NewsCrawler
 from backend.app.services.ai_client import AIModelClient
 from backend.app.services.html_generator import HTMLGenerator
+from backend.app.services.report_cache import ReportCache
+from backend.app.services.article_store import ArticleStore
+from backend.app.services.job_manager import FINAL_EVENT, JobManager
+
+
+config = Config()
+logger = setup_logger(config.MARKDOWN_LOG_OUTPUT_PATH, config.LOG_FILENAME)
+report_cache = ReportCache(config, logger)
+article_store = ArticleStore(config, logger)
+job_manager = JobManager(config, logger)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    job_manager.shutdown()
 
 
 app = FastAPI(
     title="AI News Analysis API",
     description="美國財經新聞分析與報告生成 API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-config = Config()
-logger = setup_logger(config.MARKDOWN_LOG_OUTPUT_PATH, config.LOG_FILENAME)
-
 
 class AnalysisRequest(BaseModel):
     topic: Optional[str] = (
@@ -53,16 +77,18 @@ async def root():
             "GET /api/news": "獲取新聞列表",
             "GET /api/report": "獲取 HTML 報告",
             "GET /api/status": "系統狀態",
+            "GET /api/jobs": "分析工作列表",
+            "GET /api/jobs/{job_id}": "分析工作狀態",
+            "GET /api/jobs/{job_id}/events": "分析進度即時串流（SSE）",
+            "GET /metrics": "Prometheus 格式的執行指標",
         },
     }
 
 
 @app.get("/api/status", response_model=StatusResponse)
 async def get_status():
-    html_path = config.HTML_OUTPUT_PATH / config.HTML_FILENAME
-    last_update = None
-    if html_path.exists():
-        last_update = datetime.fromtimestamp(html_path.stat().st_mtime).isoformat()
+    report = report_cache.get()
+    last_update = report.last_update if report else None
 
     return StatusResponse(
         status="running",
@@ -73,54 +99,137 @@ async def get_status():
     )
 
 
-@app.post("/api/analyze")
-async def analyze_news(request: AnalysisRequest, background_tasks: BackgroundTasks):
-    def run_analysis(topic: str):
-        try:
-            from AI_News import AI_News_Agent
+@app.post("/api/analyze", status_code=202)
+async def analyze_news(request: AnalysisRequest):
+    try:
+        job, created = job_manager.submit(request.topic)
+    except Exception as e:
+        logger.error(f"無法啟動分析工作: {e}")
+        raise HTTPException(status_code=503, detail=f"無法啟動分析工作: {e}")
 
-            agent = AI_News_Agent(config, logger)
-            agent.run(topic)
-        except Exception as e:
-            logger.error(f"背景分析任務失敗: {e}", exc_info=True)
+    return {
+        "message": (
+            "分析任務已啟動" if created else "相同主題的分析任務已在執行，已併入該任務"
+        ),
+        "job_id": job.id,
+        "topic": job.topic,
+        "status": job.status,
+        "created": created,
+    }
 
-    background_tasks.add_task(run_analysis, request.topic)
 
-    return {"message": "分析任務已啟動", "topic": request.topic, "status": "running"}
+@app.get("/api/jobs")
+async def list_jobs():
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
 
 
-@app.get("/api/news")
-async def get_news(limit: Optional[int] = 10, offset: Optional[int] = 0):
-    html_path = config.HTML_OUTPUT_PATH / config.HTML_FILENAME
-    if not html_path.exists():
-        raise HTTPException(
-            status_code=404, detail="尚未生成報告，請先執行 /api/analyze"
-        )
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"找不到分析工作: {job_id}")
+    return job.to_dict()
+
 
-    from backend.app.services.html_generator import HTMLGenerator
-    import re
-    import markdown
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"找不到分析工作: {job_id}")
+    try:
+        last_event_id = int(request.headers.get("last-event-id") or 0)
+    except ValueError:
+        last_event_id = 0
+    history, queue = job_manager.subscribe(job_id, last_event_id)
 
-    html_content = html_path.read_text(encoding="utf-8")
+    def format_event(entry: dict) -> str:
+        data = json.dumps(entry["data"], ensure_ascii=False)
+        return f"id: {entry['id']}\nevent: {entry['event']}\ndata: {data}\n\n"
+
+    async def event_stream():
+        try:
+            for entry in history:
+                yield format_event(entry)
+                if entry["event"] == FINAL_EVENT:
+                    return
+            while True:
+                try:
+                    entry = await asyncio.wait_for(
+                        queue.get(), timeout=config.SSE_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # 註解行讓代理伺服器與瀏覽器不會因閒置而斷線
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(entry)
+                if entry["event"] == FINAL_EVENT:
+                    return
+        finally:
+            job_manager.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/news")
+async def get_news(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    try:
+        items, next_cursor, total = article_store.query(
+            limit=limit,
+            cursor=cursor,
+            source=source,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "total": 0,
+        "total": total,
         "limit": limit,
-        "offset": offset,
-        "message": "請使用 /api/report 查看完整 HTML 報告",
+        "items": items,
+        "next_cursor": next_cursor,
     }
 
 
 @app.get("/api/report", response_class=HTMLResponse)
-async def get_report():
-    html_path = config.HTML_OUTPUT_PATH / config.HTML_FILENAME
-    if not html_path.exists():
+async def get_report(request: Request):
+    report = report_cache.get()
+    if report is None:
         raise HTTPException(
             status_code=404, detail="尚未生成報告，請先執行 /api/analyze"
         )
 
-    html_content = html_path.read_text(encoding="utf-8")
-    return HTMLResponse(content=html_content)
+    encoding = report_cache.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": report.etag(encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and report_cache.etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return HTMLResponse(content=report.bodies[encoding], headers=headers)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(
+        content=metrics.prometheus_text(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 
 @app.get("/api/health")
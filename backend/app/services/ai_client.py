@@ -1,8 +1,18 @@
+import json
 import time
+import asyncio
 import requests
 import logging
-from typing import Optional
+from typing import Callable, List, Mapping, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
 from ..core.config import Config
+from ..core.metrics import metrics
+from .response_cache import ResponseCache
+from .model_router import ModelRouter
+from .rate_limiter import get_rate_limiter, parse_retry_after
+
+# 提示詞可依模型產生，例如依各模型的上下文長度決定內容截斷的位置
+PromptSource = Union[str, Callable[[str], str]]
 
 
 class AIModelClient:
@@ -13,43 +23,67 @@ class AIModelClient:
             "Authorization": f"Bearer {self.config.OPENROUTER_API_KEY}",
             "Content-Type": "application/json",
         }
+        # 同步呼叫共用的 keep-alive 連線池
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.config.OPENROUTER_POOL_SIZE
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # 非同步呼叫共用的 aiohttp 連線池（綁定建立它的 event loop）
+        self._async_session = None
+        self._async_session_loop = None
+        self.response_cache = (
+            ResponseCache(config, logger) if self.config.LLM_CACHE_ENABLED else None
+        )
+        self.router = ModelRouter(config, logger)
+        self.rate_limiter = get_rate_limiter(config, logger)
 
     def call(
-        self, prompt: str, model_name: str, max_model_failures: int = 3
+        self,
+        prompt: str,
+        model_name: str,
+        max_model_failures: int = 3,
+        expected_prefix: Optional[str] = None,
     ) -> Optional[str]:
-        current_model = model_name
-        available_models = self.config.AVAILABLE_MODELS
+        """依模型健康度依序嘗試模型；expected_prefix 用於檢查輸出開頭的格式，不符視為失敗"""
+        candidates = self.router.candidates(model_name, max_model_failures)
+        cached = self._cached_response(candidates[0], prompt, expected_prefix)
+        if cached:
+            return cached
         max_retries = self.config.OPENROUTER_MAX_RETRIES
         base_delay = self.config.OPENROUTER_BASE_DELAY
-        for _ in range(max_model_failures):
+        for current_model in candidates:
             self.logger.info(f"🧠 正在使用模型: {current_model}")
-            payload = {
-                "model": current_model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": self.config.OPENROUTER_MAX_TOKENS,
-            }
+            payload = self._build_payload(prompt, current_model)
             for attempt in range(max_retries):
+                started = time.monotonic()
                 try:
-                    res = requests.post(
+                    self.rate_limiter.acquire(self.config.OPENROUTER_API_URL)
+                    res = self.session.post(
                         self.config.OPENROUTER_API_URL,
-                        headers=self.headers,
                         json=payload,
                         timeout=self.config.OPENROUTER_TIMEOUT,
                     )
+                    if self._is_model_unavailable(
+                        current_model, res.status_code, res.headers
+                    ):
+                        self._observe(current_model, started, "unavailable")
+                        break
                     res.raise_for_status()
-                    response_data = res.json()
-                    content = (
-                        response_data.get("choices", [{}])[0]
-                        .get("message", {})
-                        .get("content")
+                    content = self._extract_content(res.json())
+                    if expected_prefix:
+                        self._check_prefix(content, expected_prefix)
+                    self.router.record_success(
+                        current_model, time.monotonic() - started
                     )
-                    if content:
-                        self.logger.info(f"✅ 模型 {current_model} 成功返回內容。")
-                        return content.strip()
-                    else:
-                        raise ValueError(
-                            f"AI 模型返回了空的或無效的 content。Response: {response_data}"
-                        )
+                    self._observe(current_model, started, "success")
+                    self.logger.info(f"✅ 模型 {current_model} 成功返回內容。")
+                    if self.response_cache:
+                        # 以實際回應的模型為鍵，換用備援模型時不會混入指定模型的快取
+                        self.response_cache.set(current_model, prompt, content)
+                    return content
                 except (
                     requests.exceptions.RequestException,
                     KeyError,
@@ -57,6 +91,8 @@ class AIModelClient:
                     TypeError,
                     ValueError,
                 ) as e:
+                    self.router.record_failure(current_model)
+                    self._observe(current_model, started, "error")
                     self.logger.warning(
                         f"模型 {current_model} 發生錯誤 (嘗試 {attempt + 1}/{max_retries}): {e}"
                     )
@@ -66,13 +102,240 @@ class AIModelClient:
                         self.logger.error(
                             f"❌ 模型 {current_model} 在 {max_retries} 次重試後依然失敗。"
                         )
-                        break
-            try:
-                current_index = available_models.index(current_model)
-                next_index = (current_index + 1) % len(available_models)
-                current_model = available_models[next_index]
-                self.logger.info(f"🔄 模型切換至: {current_model}")
-            except ValueError:
-                current_model = available_models[0]
         self.logger.critical("❌ 所有可用 AI 模型均已嘗試失敗。")
         return None
+
+    async def acall(
+        self,
+        prompt: PromptSource,
+        model_name: str,
+        max_model_failures: int = 3,
+        expected_prefix: Optional[str] = None,
+    ) -> Optional[str]:
+        """call() 的 asyncio 版本：共用 keep-alive 連線池，退避等待不阻塞 event loop
+
+        prompt 可傳入 model -> 提示詞 的函式，換用備援模型時依該模型重新產生提示詞；
+        啟用 OPENROUTER_STREAM 時以 SSE 串流接收，expected_prefix 用於提早檢查輸出開頭的格式
+        """
+        import aiohttp
+
+        prompt_for = prompt if callable(prompt) else lambda model: prompt
+        candidates = self.router.candidates(model_name, max_model_failures)
+        cached = self._cached_response(
+            candidates[0], prompt_for(candidates[0]), expected_prefix
+        )
+        if cached:
+            return cached
+        max_retries = self.config.OPENROUTER_MAX_RETRIES
+        base_delay = self.config.OPENROUTER_BASE_DELAY
+        session = await self._get_async_session()
+        for current_model in candidates:
+            self.logger.info(f"🧠 正在使用模型: {current_model}")
+            model_prompt = prompt_for(current_model)
+            payload = self._build_payload(model_prompt, current_model)
+            if self.config.OPENROUTER_STREAM:
+                payload["stream"] = True
+            for attempt in range(max_retries):
+                started = time.monotonic()
+                time_to_first_token = None
+                try:
+                    await self.rate_limiter.aacquire(self.config.OPENROUTER_API_URL)
+                    async with session.post(
+                        self.config.OPENROUTER_API_URL, json=payload
+                    ) as res:
+                        if self._is_model_unavailable(
+                            current_model, res.status, res.headers
+                        ):
+                            self._observe(current_model, started, "unavailable")
+                            break
+                        res.raise_for_status()
+                        if self.config.OPENROUTER_STREAM:
+                            content, time_to_first_token = await self._read_stream(
+                                res, current_model, started, expected_prefix
+                            )
+                        else:
+                            response_data = await res.json(content_type=None)
+                            content = self._extract_content(response_data)
+                            if expected_prefix:
+                                self._check_prefix(content, expected_prefix)
+                    self.router.record_success(
+                        current_model, time.monotonic() - started, time_to_first_token
+                    )
+                    self._observe(current_model, started, "success")
+                    self.logger.info(f"✅ 模型 {current_model} 成功返回內容。")
+                    if self.response_cache:
+                        # 以實際回應的模型為鍵，換用備援模型時不會混入指定模型的快取
+                        self.response_cache.set(current_model, model_prompt, content)
+                    return content
+                except (
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    KeyError,
+                    IndexError,
+                    TypeError,
+                    ValueError,
+                ) as e:
+                    self.router.record_failure(current_model)
+                    self._observe(current_model, started, "error")
+                    self.logger.warning(
+                        f"模型 {current_model} 發生錯誤 (嘗試 {attempt + 1}/{max_retries}): {e}"
+                    )
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(base_delay * (2**attempt))
+                    else:
+                        self.logger.error(
+                            f"❌ 模型 {current_model} 在 {max_retries} 次重試後依然失敗。"
+                        )
+        self.logger.critical("❌ 所有可用 AI 模型均已嘗試失敗。")
+        return None
+
+    def _cached_response(
+        self, model: str, prompt: str, expected_prefix: Optional[str]
+    ) -> Optional[str]:
+        """查詢這次會先使用的模型的快取；不符合預期格式的舊快取不採用"""
+        if not self.response_cache:
+            return None
+        cached = self.response_cache.get(model, prompt)
+        if not cached:
+            return None
+        if expected_prefix:
+            try:
+                self._check_prefix(cached, expected_prefix)
+            except ValueError:
+                self.logger.info(f"快取內容不符合預期格式,重新呼叫模型: {model}")
+                return None
+        metrics.incr("llm_cache_hits_total", model=model)
+        return cached
+
+    async def aclose(self):
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_session_loop = None
+
+    def close(self):
+        self.session.close()
+        self.router.save()
+        self.router.log_stats()
+        if self.response_cache:
+            self.response_cache.log_stats()
+
+    async def _get_async_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if (
+            self._async_session is None
+            or self._async_session.closed
+            or self._async_session_loop is not loop
+        ):
+            connector = aiohttp.TCPConnector(
+                limit=self.config.OPENROUTER_POOL_SIZE, keepalive_timeout=60
+            )
+            self._async_session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.OPENROUTER_TIMEOUT),
+            )
+            self._async_session_loop = loop
+        return self._async_session
+
+    def _observe(self, model: str, started: float, outcome: str) -> None:
+        metrics.observe(
+            "llm_request", time.monotonic() - started, model=model, outcome=outcome
+        )
+
+    def _is_model_unavailable(
+        self, model: str, status: int, headers: Mapping[str, str]
+    ) -> bool:
+        """429 與 5xx 代表模型暫時無法服務：記錄冷卻並直接換下一個模型，不再重試同一模型
+
+        OpenRouter 的 Retry-After 多半是單一模型的限制，只用於模型冷卻；主機層級只調降請求速率
+        """
+        self.rate_limiter.record_response(self.config.OPENROUTER_API_URL, status)
+        if status != 429 and status < 500:
+            return False
+        self.router.record_failure(model, status, parse_retry_after(headers))
+        return True
+
+    async def _read_stream(
+        self, res, model: str, started: float, expected_prefix: Optional[str]
+    ) -> Tuple[str, Optional[float]]:
+        """逐行讀取 SSE 串流：首個 token 太慢、閒置過久或開頭格式不符時提早中止"""
+        idle_timeout = self.config.OPENROUTER_STREAM_IDLE_TIMEOUT
+        first_token_timeout = self.config.OPENROUTER_STREAM_FIRST_TOKEN_TIMEOUT
+        parts: List[str] = []
+        received_chars = 0
+        time_to_first_token = None
+        validated = not expected_prefix
+        while True:
+            try:
+                line = await asyncio.wait_for(res.content.readline(), idle_timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"串流閒置超過 {idle_timeout} 秒")
+            if not line:
+                break
+            if (
+                time_to_first_token is None
+                and time.monotonic() - started > first_token_timeout
+            ):
+                raise asyncio.TimeoutError(
+                    f"超過 {first_token_timeout} 秒仍未收到第一個 token"
+                )
+            line = line.decode("utf-8", "replace").strip()
+            # 冒號開頭的註解行是 OpenRouter 的 keep-alive，不算生成內容
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise ValueError(f"串流回傳錯誤: {chunk['error']}")
+            delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if not delta:
+                continue
+            if time_to_first_token is None:
+                time_to_first_token = time.monotonic() - started
+                self.logger.info(
+                    f"⚡ 模型 {model} 首個 token: {time_to_first_token:.2f} 秒"
+                )
+            parts.append(delta)
+            received_chars += len(delta)
+            if not validated and received_chars >= self.config.STREAM_VALIDATION_CHARS:
+                self._check_prefix("".join(parts), expected_prefix)
+                validated = True
+
+        content = "".join(parts).strip()
+        if not content:
+            raise ValueError("AI 模型串流未返回任何內容")
+        if not validated:
+            self._check_prefix(content, expected_prefix)
+        return content, time_to_first_token
+
+    def _check_prefix(self, text: str, expected_prefix: str) -> None:
+        """輸出開頭（略過程式碼區塊標記）的幾行內應出現預期的標題"""
+        head = text[: self.config.STREAM_VALIDATION_CHARS]
+        for line in head.lstrip().splitlines():
+            if line.startswith(expected_prefix):
+                return
+        raise ValueError(
+            f"輸出開頭不符合預期格式（應以 {expected_prefix!r} 開頭）: {head[:80]!r}"
+        )
+
+    def _build_payload(self, prompt: str, model_name: str) -> dict:
+        return {
+            "model": model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.config.OPENROUTER_MAX_TOKENS,
+        }
+
+    def _extract_content(self, response_data: dict) -> str:
+        content = (
+            response_data.get("choices", [{}])[0].get("message", {}).get("content")
+        )
+        if not content:
+            raise ValueError(
+                f"AI 模型返回了空的或無效的 content。Response: {response_data}"
+            )
+        return content.strip()
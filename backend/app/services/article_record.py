@@ -0,0 +1,117 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_BLOCK_SPLIT_RE = re.compile(r"(?m)(?=^##[^#])")
+_TITLE_RE = re.compile(r"^##(?!#)\s*(.*?)\s*$", re.M)
+_DATE_RE = re.compile(r"^- \*\*新聞日期\*\*:\s*(\d{4}-\d{2}-\d{2}[^\n]*)\s*$", re.M)
+_SOURCE_RE = re.compile(r"^- \*\*新聞來源\*\*:\s*\[(.*?)\]\((.*?)\)[ \t]*$", re.M)
+_SECTION_RE = re.compile(r"^###\s*(內容|專業評論)\s*$", re.M)
+_META_LINE_RE = re.compile(r"^- \*\*新聞(日期|來源)\*\*:.*$", re.M)
+_TRAILING_RULE_RE = re.compile(r"\n---\s*$")
+
+
+@dataclass(slots=True)
+class ArticleRecord:
+    """單篇新聞的分析結果：保留原始 URL 與來源，並拆好內容與評論段落"""
+
+    title: str
+    url: str
+    source: str
+    date: str = ""
+    content_md: str = ""
+    comment_md: str = ""
+    # AI 回傳的完整 Markdown 區塊，用於保存報告與續跑
+    markdown: str = ""
+    alternates: List[Dict[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_markdown(
+        cls,
+        block: str,
+        article: Optional[Dict] = None,
+        source_name: str = "",
+    ) -> Optional["ArticleRecord"]:
+        """解析單篇分析區塊
+
+        有傳入爬取時的 article 時，URL 與來源以原始資料為準，格式不符也不會遺失文章；
+        只有 Markdown 可用時（例如讀回舊報告），缺少標題或來源的區塊回傳 None
+        """
+        block = (block or "").replace("\r\n", "\n").strip()
+        title_match = _TITLE_RE.search(block)
+        source_match = _SOURCE_RE.search(block)
+        date_match = _DATE_RE.search(block)
+
+        if article is not None:
+            title = title_match.group(1).strip() if title_match else article["title"]
+            url = article["url"]
+            source = source_name or (
+                source_match.group(1).strip()
+                if source_match
+                else article.get("source_domain", "")
+            )
+            alternates = list(article.get("alternates", []))
+        elif title_match and source_match:
+            title = title_match.group(1).strip()
+            url = source_match.group(2).strip()
+            source = source_match.group(1).strip()
+            alternates = []
+        else:
+            return None
+
+        section_headers = list(_SECTION_RE.finditer(block))
+        content_md = ""
+        comment_md = ""
+        if section_headers:
+            content_start = section_headers[0].end()
+            content_end = (
+                section_headers[1].start() if len(section_headers) > 1 else len(block)
+            )
+            content_md = block[content_start:content_end]
+            if len(section_headers) > 1:
+                comment_md = block[section_headers[1].end() :]
+        elif article is not None:
+            # 模型沒有照格式輸出段落標題時，標題與來源行以外的內容整段視為新聞內容
+            body = _TITLE_RE.sub("", block, count=1) if title_match else block
+            content_md = _META_LINE_RE.sub("", body)
+
+        record = cls(
+            title=title,
+            url=url,
+            source=source,
+            date=date_match.group(1).strip() if date_match else "",
+            content_md=_TRAILING_RULE_RE.sub("", content_md.strip()).strip(),
+            comment_md=_TRAILING_RULE_RE.sub("", comment_md.strip()).strip(),
+            markdown=block,
+            alternates=alternates,
+        )
+        if not (title_match and source_match):
+            # 保存的報告需要標題與來源行，續跑時才能讀回這篇
+            record.markdown = record.to_markdown()
+        elif article is not None:
+            # 模型可能改寫或截斷網址，來源行一律以爬取時的網址為準，續跑才比對得到
+            source_line = f"- **新聞來源**: [{record.source}]({record.url})"
+            record.markdown = _SOURCE_RE.sub(lambda _: source_line, block, count=1)
+        return record
+
+    def to_markdown(self) -> str:
+        """依報告格式重新組出 Markdown 區塊"""
+        lines = [f"## {self.title}"]
+        if self.date:
+            lines.append(f"- **新聞日期**: {self.date}")
+        lines.append(f"- **新聞來源**: [{self.source}]({self.url})")
+        lines += ["", "### 內容", self.content_md]
+        if self.comment_md:
+            lines += ["", "### 專業評論", self.comment_md]
+        lines += ["", "---"]
+        return "\n".join(lines)
+
+
+def split_markdown_blocks(markdown_report: str) -> List[str]:
+    """以二級標題切出每篇新聞的 Markdown 區塊"""
+    normalized = (markdown_report or "").replace("\r\n", "\n").strip()
+    return [
+        block.strip()
+        for block in _BLOCK_SPLIT_RE.split(normalized)
+        if block.strip().startswith("##")
+    ]
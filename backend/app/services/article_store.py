@@ -0,0 +1,156 @@
+import json
+import time
+import base64
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from ..core.config import Config
+from .article_record import ArticleRecord
+from .seen_index import normalize_url
+
+_COLUMNS = "id, title, url, source, date, topic, content_md, comment_md, alternates"
+
+
+class ArticleStore:
+    """以 SQLite 保存分析完成的新聞，供 /api/news 依日期、來源查詢與 keyset 分頁"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.ARTICLE_DB_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            # WAL 讓 API 讀取時不會被分析流程的寫入擋住
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " url_key TEXT NOT NULL UNIQUE,"
+                " url TEXT NOT NULL,"
+                " title TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " date TEXT NOT NULL,"
+                " topic TEXT NOT NULL,"
+                " content_md TEXT NOT NULL,"
+                " comment_md TEXT NOT NULL,"
+                " alternates TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date, id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_source"
+                " ON articles (source, date, id)"
+            )
+
+    def upsert(self, records: List[ArticleRecord], topic: str) -> int:
+        """同一網址再次分析時覆寫內容，保留原本的 id 讓分頁游標維持穩定"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        rows = [
+            (
+                normalize_url(record.url),
+                record.url,
+                record.title,
+                record.source,
+                # 沒有新聞日期時以分析當天為準，確保每筆都能依日期排序
+                record.date[:10] if record.date else today,
+                topic,
+                record.content_md,
+                record.comment_md,
+                json.dumps(record.alternates, ensure_ascii=False),
+                time.time(),
+            )
+            for record in records
+        ]
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO articles (url_key, url, title, source, date, topic,"
+                    " content_md, comment_md, alternates, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (url_key) DO UPDATE SET"
+                    " url = excluded.url, title = excluded.title,"
+                    " source = excluded.source, date = excluded.date,"
+                    " topic = excluded.topic, content_md = excluded.content_md,"
+                    " comment_md = excluded.comment_md,"
+                    " alternates = excluded.alternates,"
+                    " updated_at = excluded.updated_at",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"寫入新聞資料庫失敗: {e}")
+            return 0
+        return len(rows)
+
+    def query(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        source: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str], int]:
+        """依 (date, id) 由新到舊排序，回傳 (新聞列表, 下一頁游標, 符合條件的總數)"""
+        where: List[str] = []
+        params: List = []
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            params.append(date_to)
+        filter_sql = " WHERE " + " AND ".join(where) if where else ""
+        filter_params = list(params)
+
+        if cursor:
+            cursor_date, cursor_id = self.decode_cursor(cursor)
+            where.append("(date < ? OR (date = ? AND id < ?))")
+            params += [cursor_date, cursor_date, cursor_id]
+        page_sql = " WHERE " + " AND ".join(where) if where else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM articles{page_sql}"
+                " ORDER BY date DESC, id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM articles{filter_sql}", filter_params
+            ).fetchone()[0]
+
+        items = [self._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = self.encode_cursor(last["date"], last["id"])
+        return items, next_cursor, total
+
+    @staticmethod
+    def encode_cursor(date: str, article_id: int) -> str:
+        raw = f"{date}|{article_id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """游標格式錯誤時拋出 ValueError"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            date, article_id = raw.decode("utf-8").rsplit("|", 1)
+            return date, int(article_id)
+        except Exception as e:
+            raise ValueError(f"無效的分頁游標: {cursor}") from e
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        item = dict(row)
+        item["alternates"] = json.loads(item["alternates"] or "[]")
+        return item
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Optional
+from ..core.config import Config
+
+
+class BrowserPool:
+    """整個爬取流程共用一個 crawl4ai 瀏覽器，並限制同時開啟的分頁數"""
+
+    def __init__(
+        self, config: Config, logger: logging.Logger, browser_config, crawler_config
+    ):
+        self.config = config
+        self.logger = logger
+        self.browser_config = browser_config
+        self.crawler_config = crawler_config
+        self._crawler = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def started(self) -> bool:
+        return self._crawler is not None
+
+    async def start(self) -> None:
+        """啟動瀏覽器（每次執行只啟動一次），crawl4ai 未安裝時拋出 ImportError"""
+        if self._crawler is not None:
+            return
+        from crawl4ai import AsyncWebCrawler
+
+        crawler = AsyncWebCrawler(config=self.browser_config, verbose=False)
+        await crawler.start()
+        self._crawler = crawler
+        self._semaphore = asyncio.Semaphore(max(1, self.config.CRAWL4AI_MAX_PAGES))
+        self.logger.info(
+            f"🌐 crawl4ai 瀏覽器已啟動（最多同時 {self.config.CRAWL4AI_MAX_PAGES} 個分頁）"
+        )
+
+    async def fetch_markdown(self, url: str) -> Optional[str]:
+        if self._crawler is None:
+            raise RuntimeError("BrowserPool 尚未啟動")
+        async with self._semaphore:
+            result = await self._crawler.arun(url=url, config=self.crawler_config)
+        return result.markdown if result and result.markdown else None
+
+    async def close(self) -> None:
+        if self._crawler is None:
+            return
+        crawler, self._crawler = self._crawler, None
+        try:
+            await crawler.close()
+            self.logger.info("🌐 crawl4ai 瀏覽器已關閉")
+        except Exception as e:
+            self.logger.warning(f"關閉 crawl4ai 瀏覽器時發生錯誤: {e}")
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Set, Tuple
+from ..core.config import Config
+
+# 每筆紀錄：(時間戳, 是否成功, 耗時秒數)
+Sample = Tuple[float, int, float]
+
+
+class CrawlStrategyStats:
+    """記錄各網域每種爬取策略的成功率與耗時（跨次執行保存），讓每個網域先用歷史上最划算的策略"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.CACHE_DIR / "crawl_strategy_stats.json"
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Deque[Sample]]] = {}
+        self._logged_domains: Set[str] = set()
+        self._load()
+
+    def order(self, domain: str, chain: List[str]) -> List[str]:
+        """依歷史紀錄重排預設策略順序；樣本不足的策略維持原位置，一直失敗的策略略過"""
+        with self._lock:
+            known = {
+                strategy: self._summary(domain, strategy)
+                for strategy in chain
+                if len(self._samples(domain, strategy))
+                >= self.config.CRAWL_STRATEGY_MIN_SAMPLES
+            }
+        # 依序嘗試時，成功率 / 平均耗時越高者越早嘗試，期望的總耗時最短
+        ranked = iter(
+            sorted(
+                known,
+                key=lambda strategy: -known[strategy][0] / max(known[strategy][1], 0.1),
+            )
+        )
+        ordered = [
+            next(ranked) if strategy in known else strategy for strategy in chain
+        ]
+        skipped = [
+            strategy
+            for strategy in ordered
+            if strategy in known
+            and known[strategy][2] == 0
+            and known[strategy][3] >= self.config.CRAWL_STRATEGY_SKIP_AFTER
+        ]
+        if len(skipped) < len(ordered):
+            ordered = [strategy for strategy in ordered if strategy not in skipped]
+        else:
+            skipped = []
+
+        if (ordered != chain or skipped) and domain not in self._logged_domains:
+            self._logged_domains.add(domain)
+            message = f"📚 {domain} 依歷史紀錄調整爬取順序: {' → '.join(ordered)}"
+            if skipped:
+                message += f"（略過一直失敗的 {', '.join(skipped)}）"
+            self.logger.info(message)
+        return ordered
+
+    def record(
+        self, domain: str, strategy: str, succeeded: bool, latency: float
+    ) -> None:
+        with self._lock:
+            self._samples(domain, strategy).append(
+                (round(time.time()), int(succeeded), round(latency, 2))
+            )
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                domain: {
+                    strategy: list(samples)
+                    for strategy, samples in strategies.items()
+                    if samples
+                }
+                for domain, strategies in self._stats.items()
+            }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"寫入爬取策略紀錄失敗: {e}")
+
+    def _summary(self, domain: str, strategy: str) -> Tuple[float, float, int, int]:
+        """回傳 (平滑後成功率, 平均耗時, 成功次數, 樣本數)，需在持有鎖時呼叫"""
+        samples = self._samples(domain, strategy)
+        successes = sum(ok for _, ok, _ in samples)
+        latency = sum(seconds for _, _, seconds in samples) / max(1, len(samples))
+        return (successes + 1) / (len(samples) + 2), latency, successes, len(samples)
+
+    def _samples(self, domain: str, strategy: str) -> Deque[Sample]:
+        """取得樣本並移除超過保留期限的舊紀錄，讓曾失敗的策略日後有機會重新評估"""
+        strategies = self._stats.setdefault(domain, {})
+        samples = strategies.get(strategy)
+        if samples is None:
+            samples = deque(maxlen=self.config.CRAWL_STRATEGY_WINDOW)
+            strategies[strategy] = samples
+        expire_before = time.time() - self.config.CRAWL_STRATEGY_STATS_TTL_DAYS * 86400
+        while samples and samples[0][0] < expire_before:
+            samples.popleft()
+        return samples
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            self.logger.warning(f"讀取爬取策略紀錄失敗,將重新統計: {e}")
+            return
+        for domain, strategies in data.items():
+            for strategy, samples in strategies.items():
+                self._samples(domain, strategy).extend(
+                    (float(ts), int(ok), float(seconds)) for ts, ok, seconds in samples
+                )
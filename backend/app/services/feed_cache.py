@@ -0,0 +1,70 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Optional
+from ..core.config import Config
+
+
+class FeedValidatorCache:
+    """保存每個 RSS feed 的 ETag / Last-Modified 與上次解析結果，供條件式請求使用"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.CACHE_DIR / "rss_validators.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+
+    def conditional_headers(self, feed_url: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._entries.get(feed_url)
+        if not entry or not entry.get("items"):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_items(self, feed_url: str) -> Optional[List[Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(feed_url)
+        return list(entry["items"]) if entry else None
+
+    def store(
+        self,
+        feed_url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        items: List[Dict[str, str]],
+    ) -> None:
+        with self._lock:
+            self._entries[feed_url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "items": items,
+                "fetched_at": time.time(),
+            }
+            self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            self.logger.warning(f"讀取 RSS 驗證快取失敗,將重新下載: {e}")
+            return {}
+
+    def _save(self) -> None:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"寫入 RSS 驗證快取失敗: {e}")
@@ -1,143 +1,181 @@
+import os
 import re
+import json
+import time
 import socket
+import inspect
+import hashlib
 import logging
 import markdown
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from jinja2 import Environment, FileSystemLoader
 from ..core.config import Config
+from .article_record import ArticleRecord, split_markdown_blocks
 
+# 清理規則與片段樣板已自動納入快取鍵；其他影響片段輸出的改動需調高版本，讓舊的 HTML 片段失效
+FRAGMENT_CACHE_VERSION = 1
 
-class HTMLGenerator:
-    def __init__(self, config: Config, logger: logging.Logger):
-        self.config = config
-        self.logger = logger
-        script_dir = Path(__file__).resolve().parent.parent.parent
-        self.jinja_env = Environment(loader=FileSystemLoader(script_dir / "templates"))
+# 出現即代表導航列、頁尾或廣告區塊的片段，命中後略過到下一個空行為止
+NAVIGATION_SKIP_PHRASES = (
+    "[跳過導航",
+    "[CNBC]",
+    "CNBC標誌",
+    "CNBC logo",
+    "[市場]",
+    "[商業]",
+    "[投資]",
+    "[科技]",
+    "[政治]",
+    "[影片]",
+    "[觀察清單]",
+    "[投資俱樂部]",
+    "[PRO]",
+    "[Pro新聞]",
+    "[登入]",
+    "[建立免費帳戶",
+    "菜單",
+    "搜尋報價",
+    "訂閱CNBC PRO",
+    "[訂閱投資俱樂部]",
+    "[授權與轉載]",
+    "[CNBC委員會]",
+    "[選擇個人理財]",
+    "[加入CNBC小組]",
+    "[字幕]",
+    "[數位產品]",
+    "[新聞稿]",
+    "[實習]",
+    "[更正]",
+    "[關於CNBC]",
+    "[網站地圖]",
+    "[播客]",
+    "[職業]",
+    "[幫助]",
+    "[聯繫]",
+    "[聯繫我們]",
+    "#### 新聞提示",
+    "有機密新聞提示嗎",
+    "免費訂閱新聞通訊",
+    "獲取此內容發送到您的收件箱",
+    "[立即訂閱]",
+    "#### 與我們廣告合作",
+    "[請聯繫我們]",
+    "[廣告選擇]",
+    "[隱私政策]",
+    "您的隱私選擇",
+    "[加州通知]",
+    "[服務條款]",
+    "Copyright",
+    "版權所有",
+    "Versant Media",
+    "數據是實時快照",
+    "數據至少延遲",
+    "市場數據使用條款和免責聲明",
+    "路透社標誌",
+    "發布日期",
+    "重點摘要",
+    "詳細內容",
+    "延伸閱讀",
+    "專家觀點",
+    "更多",
+    "查看直播",
+    "立即觀看",
+    "觀看影片",
+    "影片:",
+    "數位原創",
+    "新聞提示",
+    "與我們廣告合作",
+    "訂閱免費新聞稿",
+    "隱私選項",
+    "加州消費者隱私法",
+)
 
-    def _clean_markdown_content(self, content: str) -> str:
-        """清理 Markdown 內容，移除裝飾性元素和無意義內容"""
-        if not content:
-            return ""
-
-        lines = content.split("\n")
-        cleaned_lines = []
-        skip_until_empty = False
-
-        for line in lines:
-            # 跳過導航連結
-            if any(
-                skip_text in line
-                for skip_text in [
-                    "[跳過導航",
-                    "[CNBC]",
-                    "CNBC標誌",
-                    "CNBC logo",
-                    "[市場]",
-                    "[商業]",
-                    "[投資]",
-                    "[科技]",
-                    "[政治]",
-                    "[影片]",
-                    "[觀察清單]",
-                    "[投資俱樂部]",
-                    "[PRO]",
-                    "[Pro新聞]",
-                    "[登入]",
-                    "[建立免費帳戶",
-                    "菜單",
-                    "搜尋報價",
-                    "訂閱CNBC PRO",
-                    "[訂閱投資俱樂部]",
-                    "[授權與轉載]",
-                    "[CNBC委員會]",
-                    "[選擇個人理財]",
-                    "[加入CNBC小組]",
-                    "[字幕]",
-                    "[數位產品]",
-                    "[新聞稿]",
-                    "[實習]",
-                    "[更正]",
-                    "[關於CNBC]",
-                    "[網站地圖]",
-                    "[播客]",
-                    "[職業]",
-                    "[幫助]",
-                    "[聯繫]",
-                    "[聯繫我們]",
-                    "#### 新聞提示",
-                    "有機密新聞提示嗎",
-                    "免費訂閱新聞通訊",
-                    "獲取此內容發送到您的收件箱",
-                    "[立即訂閱]",
-                    "#### 與我們廣告合作",
-                    "[請聯繫我們]",
-                    "[廣告選擇]",
-                    "[隱私政策]",
-                    "您的隱私選擇",
-                    "[加州通知]",
-                    "[服務條款]",
-                    "Copyright",
-                    "版權所有",
-                    "Versant Media",
-                    "數據是實時快照",
-                    "數據至少延遲",
-                    "市場數據使用條款和免責聲明",
-                    "路透社標誌",
-                    "發布日期",
-                    "重點摘要",
-                    "詳細內容",
-                    "延伸閱讀",
-                    "專家觀點",
-                    "更多",
-                    "查看直播",
-                    "立即觀看",
-                    "觀看影片",
-                    "影片:",
-                    "數位原創",
-                    "新聞提示",
-                    "與我們廣告合作",
-                    "訂閱免費新聞稿",
-                    "隱私選項",
-                    "加州消費者隱私法",
-                ]
-            ):
-                skip_until_empty = True
-                continue
+# 所有片段合併成單一 alternation，每行只需一次掃描
+_SKIP_PHRASE_RE = re.compile(
+    "|".join(
+        re.escape(phrase)
+        for phrase in sorted(NAVIGATION_SKIP_PHRASES, key=len, reverse=True)
+    )
+)
+_DECORATIVE_IMAGE_RE = re.compile(
+    r"!\[.*?(CNBC|logo|標誌|圖示|縮圖|導航|footer|header|ad|廣告|裝飾|裝飾性|decorative|icon).*?\]",
+    re.IGNORECASE,
+)
+_THUMBNAIL_IMAGE_RE = re.compile(r"!\[縮圖.*?\].*w=\d+&h=\d+")
+_LINK_ONLY_LINE_RE = re.compile(r"^\s*\*?\s*\[.*?\]\(.*?\)\s*$")
+_EXTRA_BLANK_LINES_RE = re.compile(r"\n{3,}")
 
-            # 如果處於跳過模式，直到遇到空行才停止
-            if skip_until_empty:
-                if line.strip() == "":
-                    skip_until_empty = False
-                continue
 
+def clean_markdown_content(content: str) -> str:
+    """清理 Markdown 內容，移除裝飾性元素和無意義內容"""
+    if not content:
+        return ""
+
+    cleaned_lines = []
+    skip_until_empty = False
+    skip_phrase_search = _SKIP_PHRASE_RE.search
+    decorative_image_search = _DECORATIVE_IMAGE_RE.search
+    thumbnail_image_search = _THUMBNAIL_IMAGE_RE.search
+    link_only_line_match = _LINK_ONLY_LINE_RE.match
+
+    for line in content.split("\n"):
+        # 跳過導航連結
+        if skip_phrase_search(line):
+            skip_until_empty = True
+            continue
+
+        # 如果處於跳過模式，直到遇到空行才停止
+        if skip_until_empty:
+            if line.strip() == "":
+                skip_until_empty = False
+            continue
+
+        # 跳過圖片行的檢查只在含有圖片語法時進行
+        if "![" in line:
             # 跳過裝飾性圖片（CNBC logo 等）
-            if re.search(
-                r"!\[.*?(CNBC|logo|標誌|圖示|縮圖|導航|footer|header|ad|廣告|裝飾|裝飾性|decorative|icon).*?\]",
-                line,
-                re.IGNORECASE,
-            ):
+            if decorative_image_search(line):
                 continue
             # 跳過小尺寸縮圖圖片
-            if re.search(r"!\[縮圖.*?\].*w=\d+&h=\d+", line):
+            if thumbnail_image_search(line):
                 continue
 
-            # 跳過純連結行（不包含文字內容的單行連結）
-            if re.match(r"^\s*\*?\s*\[.*?\]\(.*?\)\s*$", line) and len(line) < 200:
-                continue
+        # 跳過純連結行（不包含文字內容的單行連結）
+        if len(line) < 200 and "](" in line and link_only_line_match(line):
+            continue
 
-            # 跳過過長的導航欄（包含很多連結和符號的行）
-            if len(line) > 500 and "*" in line and "[" in line:
-                continue
+        # 跳過過長的導航欄（包含很多連結和符號的行）
+        if len(line) > 500 and "*" in line and "[" in line:
+            continue
 
-            cleaned_lines.append(line)
+        cleaned_lines.append(line)
 
-        cleaned_content = "\n".join(cleaned_lines)
-        cleaned_content = re.sub(r"\n{3,}", "\n\n", cleaned_content)
-        cleaned_content = cleaned_content.strip()
+    cleaned_content = "\n".join(cleaned_lines)
+    cleaned_content = _EXTRA_BLANK_LINES_RE.sub("\n\n", cleaned_content)
+    cleaned_content = cleaned_content.strip()
 
-        return cleaned_content
+    return cleaned_content
+
+
+class HTMLGenerator:
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        script_dir = Path(__file__).resolve().parent.parent.parent
+        self.jinja_env = Environment(loader=FileSystemLoader(script_dir / "templates"))
+        self.fragment_dir = self.config.CACHE_DIR / "html_fragments"
+        self.fragment_hits = 0
+        self.fragment_misses = 0
+        self._fragment_rules_hash: Optional[str] = None
+        if self.config.HTML_FRAGMENT_CACHE_ENABLED:
+            self.fragment_dir.mkdir(parents=True, exist_ok=True)
+            self._prune_fragments()
+
+    def _clean_markdown_content(self, content: str) -> str:
+        """清理 Markdown 內容，移除裝飾性元素和無意義內容"""
+        return clean_markdown_content(content)
 
     def _is_comment_meaningful(self, comment: str, content: str) -> bool:
         """檢查評論是否有實質意義"""
@@ -209,78 +247,52 @@ class HTMLGenerator:
     def parse_and_render_html(
         self, markdown_report: str, market_summary_md: str, topic_title: str
     ) -> bool:
-        self.logger.info(f"--- [步驟 6/6] 正在解析 Markdown 並生成 HTML...")
-        articles = []
-        normalized_report = markdown_report.replace("\r\n", "\n").strip()
-        # 使用更簡單的匹配：以 ## 開頭，後面不是 #
-        blocks = re.split(r"(?m)(?=^##[^#])", normalized_report)
+        """從合併後的 Markdown 報告解析出文章再渲染（供只有 Markdown 的情境使用）"""
+        blocks = split_markdown_blocks(markdown_report)
         self.logger.info(f"Markdown 報告共分割成 {len(blocks)} 個區塊")
+        records = []
         for i, block in enumerate(blocks):
-            block = block.strip()
-            if not block or len(block) < 50:
-                continue
-            title_match = re.search(r"^##\s*(.*?)\s*$", block, re.M)
-            date_match = re.search(
-                r"^- \*\*新聞日期\*\*:\s*(\d{4}-\d{2}-\d{2}[^\n]*)\s*$", block, re.M
-            )
-            source_match = re.search(
-                r"^- \*\*新聞來源\*\*:\s*\[(.*?)\]\((.*?)\)\s*$", block, re.M
-            )
-            if not title_match or not source_match:
+            record = ArticleRecord.from_markdown(block)
+            if record is None:
+                title_match = re.search(r"^##\s*(.*?)\s*$", block, re.M)
                 title_preview = title_match.group(1)[:60] if title_match else "無標題"
-                source_preview = (
-                    source_match.group(1)[:30] if source_match else "無來源"
-                )
                 self.logger.warning(
-                    f"跳過無效的 Markdown 區塊 #{i + 1}: 標題={title_preview}, 來源={source_preview}"
+                    f"跳過無效的 Markdown 區塊 #{i + 1}: 標題={title_preview}"
                 )
                 continue
-            section_headers = list(
-                re.finditer(r"^###\s*(內容|專業評論)\s*$", block, re.M)
-            )
-            content_text = ""
-            comment_text = ""
-            if section_headers:
-                content_start = section_headers[0].end()
-                content_end = (
-                    section_headers[1].start()
-                    if len(section_headers) > 1
-                    else len(block)
-                )
-                content_text = block[content_start:content_end].strip()
-                if len(section_headers) > 1:
-                    comment_start = section_headers[1].end()
-                    comment_text = block[comment_start:].strip()
-            content_text = re.sub(r"\n---\s*$", "", content_text).strip()
-            comment_text = re.sub(r"\n---\s*$", "", comment_text).strip()
-
-            # 清理新聞內容：移除裝飾性圖片和導航連結
-            content_text = self._clean_markdown_content(content_text)
-            comment_text = self._clean_markdown_content(comment_text)
-
-            # 檢查評論質量，如果評論空泛則不顯示
-            is_meaningful = self._is_comment_meaningful(comment_text, content_text)
-            if not is_meaningful:
-                self.logger.info(
-                    f"評論質量不足或包含無意義內容，已移除評論: {title_match.group(1)[:50]}"
-                )
-                comment_text = ""
+            records.append(record)
+        return self.render_records(records, market_summary_md, topic_title)
 
-            articles.append(
+    def render_records(
+        self,
+        records: List[ArticleRecord],
+        market_summary_md: str,
+        topic_title: str,
+    ) -> bool:
+        """直接以分析階段產生的 ArticleRecord 渲染 HTML，不需再從 Markdown 反解析"""
+        self.logger.info(f"--- [步驟 6/6] 正在生成 HTML...")
+        self.fragment_hits = self.fragment_misses = 0
+        try:
+            articles = [
                 {
-                    "title": title_match.group(1).strip(),
-                    "date": date_match.group(1).strip() if date_match else "",
-                    "source": source_match.group(1).strip(),
-                    "url": source_match.group(2).strip(),
-                    "content_html": markdown.markdown(content_text),
-                    "comment_html": markdown.markdown(comment_text),
+                    "title": record.title,
+                    "date": record.date,
+                    "body_html": self._render_article_fragment(record),
                 }
-            )
+                for record in records
+            ]
+        except Exception as e:
+            self.logger.error(f"生成新聞 HTML 片段時發生錯誤: {e}", exc_info=True)
+            self._log_html_fail()
+            return False
         if not articles:
-            self.logger.error("無法從 AI 分析結果解析出新聞,跳過 HTML 生成")
+            self.logger.error("沒有可渲染的新聞,跳過 HTML 生成")
             self._log_html_fail()
             return False
-        self.logger.info(f"從 Markdown 解析出 {len(articles)} 則新聞")
+        self.logger.info(
+            f"共 {len(articles)} 則新聞寫入 HTML"
+            f"（🧩 重用 {self.fragment_hits} 個片段，重新渲染 {self.fragment_misses} 個）"
+        )
         now = datetime.now()
         article_gen_time = (
             articles[0]["date"]
@@ -304,7 +316,10 @@ class HTMLGenerator:
             template = self.jinja_env.get_template(self.config.JINJA_TEMPLATE_FILE)
             html_output = template.render(template_data)
             output_path = self.config.HTML_OUTPUT_PATH / self.config.HTML_FILENAME
-            output_path.write_text(html_output, encoding="utf-8")
+            # 先寫入暫存檔再替換，API 不會讀到寫到一半的報告
+            tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+            tmp_path.write_text(html_output, encoding="utf-8")
+            os.replace(tmp_path, output_path)
             self.logger.info(f"完成報告生成! HTML 已輸出到: {output_path}")
             return True
         except Exception as e:
@@ -312,6 +327,124 @@ class HTMLGenerator:
             self._log_html_fail()
             return False
 
+    def _render_article_fragment(self, record: ArticleRecord) -> str:
+        """單篇新聞的 HTML 片段（清理、Markdown 轉換與片段樣板），依內容雜湊快取在磁碟"""
+        if not self.config.HTML_FRAGMENT_CACHE_ENABLED:
+            self.fragment_misses += 1
+            return self._build_article_fragment(record)
+        path = self.fragment_dir / f"{self._fragment_key(record)}.html"
+        try:
+            fragment = path.read_text(encoding="utf-8")
+            # 更新修改時間，常用的片段不會被當成過期清除
+            os.utime(path)
+            self.fragment_hits += 1
+            return fragment
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"讀取 HTML 片段快取失敗: {e}")
+
+        self.fragment_misses += 1
+        fragment = self._build_article_fragment(record)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.fragment_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(fragment)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"寫入 HTML 片段快取失敗: {e}")
+        return fragment
+
+    def _build_article_fragment(self, record: ArticleRecord) -> str:
+        # 清理新聞內容：移除裝飾性圖片和導航連結
+        content_text = self._clean_markdown_content(record.content_md)
+        comment_text = self._clean_markdown_content(record.comment_md)
+
+        # 檢查評論質量，如果評論空泛則不顯示
+        if not self._is_comment_meaningful(comment_text, content_text):
+            self.logger.info(
+                f"評論質量不足或包含無意義內容，已移除評論: {record.title[:50]}"
+            )
+            comment_text = ""
+
+        template = self.jinja_env.get_template(
+            self.config.ARTICLE_FRAGMENT_TEMPLATE_FILE
+        )
+        return template.render(
+            article={
+                "date": record.date,
+                "source": record.source,
+                "url": record.url,
+                "content_html": markdown.markdown(content_text),
+                "comment_html": markdown.markdown(comment_text),
+                "alternates": record.alternates,
+            }
+        ).strip()
+
+    def _fragment_key(self, record: ArticleRecord) -> str:
+        """片段內容只取決於這些欄位，以及片段樣板與清理規則"""
+        if self._fragment_rules_hash is None:
+            self._fragment_rules_hash = self._compute_fragment_rules_hash()
+        payload = json.dumps(
+            [
+                self._fragment_rules_hash,
+                record.date,
+                record.source,
+                record.url,
+                record.alternates,
+                record.content_md,
+                record.comment_md,
+            ],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _compute_fragment_rules_hash(self) -> str:
+        """片段樣板、導航片語、清理用的正規表示式與清理／評論檢查函式的原始碼，任一改變都讓舊片段失效"""
+        template_source = self.jinja_env.loader.get_source(
+            self.jinja_env, self.config.ARTICLE_FRAGMENT_TEMPLATE_FILE
+        )[0]
+        code_sources = []
+        for function in (clean_markdown_content, HTMLGenerator._is_comment_meaningful):
+            try:
+                code_sources.append(inspect.getsource(function))
+            except (OSError, TypeError):
+                # 沒有原始碼可讀時退回比對位元組碼與常數
+                code_sources.append(
+                    repr((function.__code__.co_code, function.__code__.co_consts))
+                )
+        rules = [
+            FRAGMENT_CACHE_VERSION,
+            markdown.__version__,
+            template_source,
+            list(NAVIGATION_SKIP_PHRASES),
+            [
+                pattern.pattern
+                for pattern in (
+                    _SKIP_PHRASE_RE,
+                    _DECORATIVE_IMAGE_RE,
+                    _THUMBNAIL_IMAGE_RE,
+                    _LINK_ONLY_LINE_RE,
+                    _EXTRA_BLANK_LINES_RE,
+                )
+            ],
+            code_sources,
+        ]
+        return hashlib.sha256(
+            json.dumps(rules, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    def _prune_fragments(self) -> None:
+        """刪除超過保留天數未使用的 HTML 片段"""
+        expire_before = time.time() - self.config.HTML_FRAGMENT_RETENTION_DAYS * 86400
+        for path in self.fragment_dir.glob("*.html"):
+            try:
+                if path.stat().st_mtime < expire_before:
+                    path.unlink()
+            except OSError:
+                continue
+
     def _log_html_fail(self):
         fail_report_path = (
             self.config.MARKDOWN_LOG_OUTPUT_PATH / "Generat_Fail_Report.txt"
@@ -0,0 +1,263 @@
+import uuid
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.config import Config
+from ..core.metrics import metrics
+
+ACTIVE_STATUSES = ("queued", "running")
+# 工作結束時最後一個事件，SSE 串流收到後即關閉
+FINAL_EVENT = "job_finished"
+# worker 回傳該次執行的指標，只合併到 API 行程的 metrics，不轉給 SSE 訂閱者
+METRICS_EVENT = "job_metrics"
+
+
+@dataclass
+class Job:
+    id: str
+    topic: str
+    key: str
+    status: str = "queued"
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    # 因同主題已在執行而併入此工作的請求數
+    attached_requests: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _run_analysis_job(topic: str, job_id: str, event_queue: Any) -> bool:
+    """在獨立的 worker 行程中執行完整分析流程，進度事件經由 Manager 佇列送回 API 行程"""
+    from AI_News import AI_News_Agent
+    from ..core.logger import setup_logger
+    from ..core.metrics import metrics
+
+    def report(event: str, data: Dict) -> None:
+        event_queue.put((job_id, event, data))
+
+    config = Config()
+    logger = setup_logger(config.MARKDOWN_LOG_OUTPUT_PATH, config.LOG_FILENAME)
+    try:
+        return AI_News_Agent(config, logger, progress_callback=report).run(topic)
+    finally:
+        # 指標記錄在 worker 行程，送回 API 行程後 /metrics 才看得到
+        event_queue.put((job_id, METRICS_EVENT, metrics.export_state()))
+
+
+class JobManager:
+    """分析工作佇列：同一主題、同一天最多一個執行中的工作，分析在獨立行程中執行，不佔用 API 的 worker"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._event_queue = None
+        self._events: Dict[str, List[Dict]] = {}
+        self._subscribers: Dict[
+            str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]
+        ] = {}
+
+    def submit(self, topic: str) -> Tuple[Job, bool]:
+        """回傳 (工作, 是否新建)；同主題當天已有排隊或執行中的工作時直接併入
+
+        無法送進行程池時，工作標記為失敗後重新拋出原本的例外
+        """
+        key = f"{datetime.now().strftime('%Y-%m-%d')}|{topic}"
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.status in ACTIVE_STATUSES:
+                    job.attached_requests += 1
+                    self.logger.info(f"📌 主題已在分析中,併入工作 {job.id}: {topic}")
+                    return job, False
+
+            job = Job(id=uuid.uuid4().hex[:12], topic=topic, key=key)
+            self._jobs[job.id] = job
+            self._events[job.id] = []
+            self._trim_history()
+            try:
+                try:
+                    future = self._get_executor().submit(
+                        _run_analysis_job, topic, job.id, self._event_queue
+                    )
+                except BrokenProcessPool:
+                    # 上一個 worker 行程異常結束，換新的行程池再送出一次
+                    self._executor = None
+                    future = self._get_executor().submit(
+                        _run_analysis_job, topic, job.id, self._event_queue
+                    )
+            except Exception as e:
+                # 不能留在排隊狀態，否則同主題之後的請求會一直併入這個不會執行的工作
+                job.status = "failed"
+                job.finished_at = datetime.now().isoformat()
+                job.error = f"無法啟動分析工作: {e}"
+                submit_error = e
+            else:
+                submit_error = None
+        if submit_error is not None:
+            self.logger.error(f"❌ 分析工作 {job.id} 無法啟動: {submit_error}")
+            self._publish(
+                job.id, FINAL_EVENT, {"status": job.status, "error": job.error}
+            )
+            raise submit_error
+        future.add_done_callback(lambda done: self._finish(job, done))
+        self.logger.info(f"🆕 已建立分析工作 {job.id}: {topic}")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def subscribe(
+        self, job_id: str, last_event_id: int = 0
+    ) -> Tuple[List[Dict], asyncio.Queue]:
+        """回傳 last_event_id 之後的歷史事件，以及接收後續事件的 asyncio 佇列"""
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            history = [
+                entry
+                for entry in self._events.get(job_id, [])
+                if entry["id"] > last_event_id
+            ]
+            self._subscribers.setdefault(job_id, []).append((loop, queue))
+        return history, queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [
+                (loop, q) for loop, q in subscribers if q is not queue
+            ]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+            event_queue, self._event_queue = self._event_queue, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            try:
+                event_queue.put(None)
+            except Exception:
+                pass
+            manager.shutdown()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # spawn 讓 worker 不繼承 API 行程的 event loop 與連線；單一 worker 讓分析依序執行
+        context = multiprocessing.get_context("spawn")
+        if self._manager is None:
+            self._manager = context.Manager()
+            self._event_queue = self._manager.Queue()
+            threading.Thread(
+                target=self._pump_events,
+                args=(self._event_queue,),
+                name="job-events",
+                daemon=True,
+            ).start()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.config.JOB_MAX_WORKERS, mp_context=context
+            )
+        return self._executor
+
+    def _pump_events(self, event_queue: Any) -> None:
+        """把 worker 行程送回的進度事件轉給各 SSE 訂閱者"""
+        while True:
+            try:
+                item = event_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event, data = item
+            if event == METRICS_EVENT:
+                metrics.merge(data)
+                continue
+            self._publish(job_id, event, data)
+
+    def _publish(self, job_id: str, event: str, data: Dict) -> None:
+        with self._lock:
+            history = self._events.get(job_id)
+            if history is None:
+                return
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "queued":
+                # worker 回報第一個事件即代表已開始執行
+                job.status = "running"
+                job.started_at = datetime.now().isoformat()
+            entry = {
+                "id": len(history) + 1,
+                "event": event,
+                "data": {**data, "time": datetime.now().isoformat()},
+            }
+            history.append(entry)
+            subscribers = list(self._subscribers.get(job_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, entry)
+            except RuntimeError:
+                # 訂閱者的 event loop 已關閉
+                continue
+
+    def _finish(self, job: Job, future: Future) -> None:
+        error: Optional[BaseException] = None
+        succeeded = False
+        if future.cancelled():
+            error = RuntimeError("工作已取消")
+        else:
+            error = future.exception()
+            succeeded = error is None and bool(future.result())
+        with self._lock:
+            job.status = "succeeded" if succeeded else "failed"
+            job.finished_at = datetime.now().isoformat()
+            if error is not None:
+                job.error = str(error) or type(error).__name__
+                if isinstance(error, BrokenProcessPool):
+                    # worker 行程異常結束，下次建立新的行程池
+                    self._executor = None
+            elif not succeeded:
+                job.error = "分析流程未完成，詳見日誌"
+            event_queue = self._event_queue
+        if succeeded:
+            self.logger.info(f"✅ 分析工作 {job.id} 完成")
+        else:
+            self.logger.error(f"❌ 分析工作 {job.id} 失敗: {job.error}")
+
+        final = (job.id, FINAL_EVENT, {"status": job.status, "error": job.error})
+        try:
+            # 經由同一個佇列送出，確保排在 worker 的最後一個事件之後
+            event_queue.put(final)
+        except Exception:
+            self._publish(*final)
+
+    def _trim_history(self) -> None:
+        """只保留最近 JOB_HISTORY_LIMIT 筆已結束的工作"""
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status not in ACTIVE_STATUSES
+        ]
+        excess = len(self._jobs) - self.config.JOB_HISTORY_LIMIT
+        for job_id in finished[: max(0, excess)]:
+            del self._jobs[job_id]
+            self._events.pop(job_id, None)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import List, Optional
+from ..core.config import Config
+from .ai_client import AIModelClient
+from .article_record import ArticleRecord
+
+
+class MarketSummarizer:
+    """分批摘要再合併的市場總評：每個提示詞的長度都有上限，與新聞篇數無關"""
+
+    def __init__(
+        self, config: Config, logger: logging.Logger, ai_client: AIModelClient
+    ):
+        self.config = config
+        self.logger = logger
+        self.ai_client = ai_client
+
+    async def summarize(self, records: List[ArticleRecord]) -> Optional[str]:
+        model = self.config.SUMMARY_GENERATION_MODEL
+        max_chars = self.config.SUMMARY_MAX_INPUT_CHARS
+        digests = [self._digest(record) for record in records]
+        joined = "\n\n".join(digests)
+        if len(joined) <= max_chars:
+            # 內容夠短時維持單次呼叫
+            return await self.ai_client.acall(
+                self.config.SUMMARY_PROMPT_TEMPLATE.format(analyzed_markdown=joined),
+                model,
+            )
+
+        semaphore = asyncio.Semaphore(max(1, self.config.ANALYSIS_MAX_CONCURRENCY))
+        partials = await self._summarize_groups(
+            self._group(digests, self.config.SUMMARY_BATCH_SIZE), semaphore
+        )
+        level = 1
+        # 合併後仍超過上限就再摘要一層；每段不超過上限一半，確保每層至少減半
+        while len("\n\n".join(partials)) > max_chars and len(partials) > 1:
+            groups = self._group(partials, len(partials))
+            if len(groups) >= len(partials):
+                break
+            level += 1
+            self.logger.info(f"市場總評第 {level} 層合併: {len(partials)} 段重點")
+            partials = await self._summarize_groups(groups, semaphore)
+        if not partials:
+            return None
+
+        self.logger.info(f"以 {len(partials)} 段分批重點生成最終市場總評")
+        return await self.ai_client.acall(
+            self.config.SUMMARY_REDUCE_PROMPT_TEMPLATE.format(
+                partial_summaries="\n\n".join(partials)
+            ),
+            model,
+        )
+
+    async def _summarize_groups(
+        self, groups: List[List[str]], semaphore: asyncio.Semaphore
+    ) -> List[str]:
+        # 預留分隔符號的長度，兩段重點一定能放進同一組
+        half_budget = self.config.SUMMARY_MAX_INPUT_CHARS // 2 - 2
+
+        async def summarize_group(i: int, group: List[str]) -> Optional[str]:
+            prompt = self.config.SUMMARY_BATCH_PROMPT_TEMPLATE.format(
+                analyzed_markdown="\n\n".join(group)
+            )
+            async with semaphore:
+                partial = await self.ai_client.acall(
+                    prompt, self.config.SUMMARY_GENERATION_MODEL
+                )
+            if not partial:
+                self.logger.warning(f"第 {i} 批市場重點生成失敗,略過該批")
+                return None
+            return self._truncate(partial.strip(), half_budget)
+
+        self.logger.info(f"正在分 {len(groups)} 批生成市場重點...")
+        results = await asyncio.gather(
+            *(summarize_group(i, group) for i, group in enumerate(groups, 1))
+        )
+        return [partial for partial in results if partial]
+
+    def _group(self, texts: List[str], max_items: int) -> List[List[str]]:
+        """依序把文字分組，每組不超過 max_items 篇也不超過字數上限"""
+        max_chars = self.config.SUMMARY_MAX_INPUT_CHARS
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        for text in texts:
+            if current and (
+                len(current) >= max(1, max_items)
+                or current_chars + len(text) > max_chars
+            ):
+                groups.append(current)
+                current, current_chars = [], 0
+            current.append(text)
+            current_chars += len(text) + 2
+        if current:
+            groups.append(current)
+        return groups
+
+    def _digest(self, record: ArticleRecord) -> str:
+        """總評只需要每篇的重點：標題、來源與截斷後的內容和評論"""
+        budget = min(
+            self.config.SUMMARY_ARTICLE_MAX_CHARS,
+            self.config.SUMMARY_MAX_INPUT_CHARS // 2,
+        )
+        lines = [f"## {record.title}", f"- **新聞來源**: {record.source}"]
+        if record.date:
+            lines.append(f"- **新聞日期**: {record.date}")
+        comment_budget = budget // 3 if record.comment_md else 0
+        lines.append(self._truncate(record.content_md, budget - comment_budget))
+        if record.comment_md:
+            lines.append(
+                "### 專業評論\n" + self._truncate(record.comment_md, comment_budget)
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _truncate(text: str, limit: int) -> str:
+        if len(text) <= limit:
+            return text
+        return text[: max(0, limit - 1)].rstrip() + "…"
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from ..core.config import Config
+
+
+class ModelRouter:
+    """記錄各模型的成功率、延遲與 429/5xx 冷卻時間（跨次執行保存），每次請求優先使用目前最健康的模型"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.CACHE_DIR / "model_health.json"
+        self._lock = threading.Lock()
+        self._health: Dict[str, Dict] = {}
+        self._load()
+
+    def candidates(self, model_name: str, max_models: int) -> List[str]:
+        """依健康度排序要嘗試的模型；指定模型同分時優先，冷卻中的模型排在最後"""
+        models = [model_name] + [
+            model for model in self.config.AVAILABLE_MODELS if model != model_name
+        ]
+        now = time.time()
+
+        def rank(model: str):
+            cooldown_until = self._entry(model)["cooldown_until"]
+            if cooldown_until > now:
+                return (1, cooldown_until, 0.0, 0.0)
+            return (
+                0,
+                0.0,
+                -round(self.success_rate(model), 1),
+                self.latency_percentile(model, 50),
+            )
+
+        with self._lock:
+            ranked = sorted(models, key=rank)
+        if ranked[0] != model_name:
+            self.logger.info(
+                f"🧭 依模型健康度改用 {ranked[0]}（指定模型 {model_name}）"
+            )
+        return ranked[: max(1, max_models)]
+
+    def record_success(
+        self, model: str, latency: float, time_to_first_token: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            entry = self._entry(model)
+            entry["outcomes"].append(1)
+            entry["latencies"].append(round(latency, 2))
+            if time_to_first_token is not None:
+                entry["ttfts"].append(round(time_to_first_token, 2))
+            entry["cooldown_until"] = 0.0
+            entry["consecutive_cooldowns"] = 0
+
+    def record_failure(
+        self,
+        model: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """一般錯誤只計入失敗率；429 與 5xx 另外讓模型冷卻一段時間"""
+        with self._lock:
+            entry = self._entry(model)
+            entry["outcomes"].append(0)
+            if status is None or (status != 429 and status < 500):
+                return
+            if retry_after is not None:
+                cooldown = retry_after
+            else:
+                base = (
+                    self.config.MODEL_RATE_LIMIT_COOLDOWN
+                    if status == 429
+                    else self.config.MODEL_ERROR_COOLDOWN
+                )
+                # 連續被限流時冷卻時間加倍
+                cooldown = base * (2 ** min(entry["consecutive_cooldowns"], 5))
+            entry["consecutive_cooldowns"] += 1
+            entry["cooldown_until"] = max(
+                entry["cooldown_until"], time.time() + cooldown
+            )
+        self.logger.warning(f"⏸️ 模型 {model} 回應 {status}，冷卻 {cooldown:.0f} 秒")
+
+    def success_rate(self, model: str) -> float:
+        outcomes = self._entry(model)["outcomes"]
+        # 沒有紀錄的模型視為中等健康，讓它有機會被嘗試
+        return (sum(outcomes) + 1) / (len(outcomes) + 2)
+
+    def latency_percentile(
+        self, model: str, percentile: int, key: str = "latencies"
+    ) -> float:
+        latencies = sorted(self._entry(model)[key])
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                model: {
+                    "outcomes": list(entry["outcomes"]),
+                    "latencies": list(entry["latencies"]),
+                    "ttfts": list(entry["ttfts"]),
+                    "cooldown_until": entry["cooldown_until"],
+                    "consecutive_cooldowns": entry["consecutive_cooldowns"],
+                }
+                for model, entry in self._health.items()
+            }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"寫入模型健康紀錄失敗: {e}")
+
+    def log_stats(self) -> None:
+        for model, entry in self._health.items():
+            if not entry["outcomes"]:
+                continue
+            message = (
+                f"🧭 {model}: 成功率 {self.success_rate(model):.0%}，"
+                f"延遲 p50 {self.latency_percentile(model, 50):.1f}s / "
+                f"p90 {self.latency_percentile(model, 90):.1f}s"
+            )
+            if entry["ttfts"]:
+                message += (
+                    f"，首個 token p50 "
+                    f"{self.latency_percentile(model, 50, 'ttfts'):.1f}s"
+                )
+            self.logger.info(message)
+
+    def _entry(self, model: str) -> Dict:
+        entry = self._health.get(model)
+        if entry is None:
+            window = self.config.MODEL_HEALTH_WINDOW
+            entry = {
+                "outcomes": deque(maxlen=window),
+                "latencies": deque(maxlen=window),
+                "ttfts": deque(maxlen=window),
+                "cooldown_until": 0.0,
+                "consecutive_cooldowns": 0,
+            }
+            self._health[model] = entry
+        return entry
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            self.logger.warning(f"讀取模型健康紀錄失敗,將重新統計: {e}")
+            return
+        for model, saved in data.items():
+            entry = self._entry(model)
+            entry["outcomes"].extend(saved.get("outcomes", []))
+            entry["latencies"].extend(saved.get("latencies", []))
+            entry["ttfts"].extend(saved.get("ttfts", []))
+            entry["cooldown_until"] = float(saved.get("cooldown_until", 0.0))
+            entry["consecutive_cooldowns"] = int(saved.get("consecutive_cooldowns", 0))
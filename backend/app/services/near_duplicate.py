@@ -0,0 +1,107 @@
+import re
+import hashlib
+import logging
+from typing import Dict, List
+from ..core.config import Config
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateDetector:
+    """以 MinHash 估計文章內容的 Jaccard 相似度，將同一則報導的多個來源合併"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.num_perm = self.config.NEAR_DUP_NUM_PERM
+        # 固定種子產生的雜湊參數，讓相同內容在每次執行得到相同簽章
+        self._permutations = [
+            (
+                int.from_bytes(self._hash_bytes(f"a{i}".encode()), "big") | 1,
+                int.from_bytes(self._hash_bytes(f"b{i}".encode()), "big"),
+            )
+            for i in range(self.num_perm)
+        ]
+
+    def deduplicate(self, articles: List[Dict]) -> List[Dict]:
+        """每個相似群組只保留最先出現的文章，其餘來源記錄在代表文章的 alternates"""
+        if len(articles) < 2:
+            return articles
+        signatures = [
+            self._signature(article.get("content", "")) for article in articles
+        ]
+
+        parent = list(range(len(articles)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        threshold = self.config.NEAR_DUP_THRESHOLD
+        for i in range(len(articles)):
+            if signatures[i] is None:
+                continue
+            for j in range(i + 1, len(articles)):
+                if signatures[j] is None or find(i) == find(j):
+                    continue
+                if self._similarity(signatures[i], signatures[j]) >= threshold:
+                    # 根節點保持為較早出現的文章，也就是來源優先順序較高者
+                    root_i, root_j = find(i), find(j)
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        representatives: Dict[int, Dict] = {}
+        kept: List[Dict] = []
+        for i, article in enumerate(articles):
+            root = find(i)
+            if root == i:
+                representative = dict(article, alternates=[])
+                representatives[i] = representative
+                kept.append(representative)
+                continue
+            representatives[root]["alternates"].append(
+                {
+                    "title": article.get("title", ""),
+                    "url": article.get("url", ""),
+                    "source_name": article.get("source_name")
+                    or article.get("source_domain", ""),
+                }
+            )
+            self.logger.info(
+                f"🔁 相似報導合併: {article.get('title', '')[:60]} → {representatives[root].get('title', '')[:60]}"
+            )
+
+        merged = len(articles) - len(kept)
+        if merged:
+            self.logger.info(
+                f"相似報導去重: {len(articles)} 篇合併為 {len(kept)} 篇（省下 {merged} 次 AI 分析）"
+            )
+        return kept
+
+    def _signature(self, content: str):
+        words = re.findall(r"\w+", (content or "").lower())[
+            : self.config.NEAR_DUP_MAX_WORDS
+        ]
+        size = self.config.NEAR_DUP_SHINGLE_SIZE
+        if len(words) < size:
+            return None
+        shingle_hashes = {
+            int.from_bytes(
+                self._hash_bytes(" ".join(words[k : k + size]).encode()), "big"
+            )
+            & _MAX_HASH
+            for k in range(len(words) - size + 1)
+        }
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in shingle_hashes)
+            for a, b in self._permutations
+        ]
+
+    def _similarity(self, sig_a: List[int], sig_b: List[int]) -> float:
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    @staticmethod
+    def _hash_bytes(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=8).digest()
@@ -1,104 +1,221 @@
 import re
-import requests
+import time
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import aiohttp
+from typing import Callable, List, Dict, Optional
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from ..core.config import Config
+from ..core.metrics import metrics
+from .browser_pool import BrowserPool
+from .crawl_strategy_stats import CrawlStrategyStats
+from .page_cache import PageCache
+from .rate_limiter import get_rate_limiter, parse_retry_after
+
+STRATEGY_LABELS = {
+    "crawl4ai": "crawl4ai",
+    "enhanced_headers": "改進請求頭",
+    "tavily": "Tavily",
+    "beautifulsoup": "BeautifulSoup",
+}
+# 各策略抓到的原始內容在網頁快取中的種類
+STRATEGY_CACHE_KINDS = {
+    "crawl4ai": "markdown",
+    "enhanced_headers": "html",
+    "tavily": "tavily",
+    "beautifulsoup": "html",
+}
+# 每篇爬取結束時的回呼：(RSS 項目, 爬取結果或 None, 已完成篇數, 總篇數)
+ArticleCallback = Callable[[Dict, Optional[Dict], int, int], None]
 
 
 class NewsCrawler:
-    def __init__(self, config: Config, logger: logging.Logger):
+    def __init__(
+        self,
+        config: Config,
+        logger: logging.Logger,
+        page_cache: Optional[PageCache] = None,
+    ):
         self.config = config
         self.logger = logger
-
-    def scrape_articles_concurrently(self, rss_items: List[Dict]) -> List[Dict]:
+        self.page_cache = page_cache
+        self._browser_pool: Optional[BrowserPool] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.rate_limiter = get_rate_limiter(config, logger)
+        self.strategy_stats = CrawlStrategyStats(config, logger)
+
+    def scrape_articles_concurrently(
+        self, rss_items: List[Dict], on_article: Optional[ArticleCallback] = None
+    ) -> List[Dict]:
+        return asyncio.run(self.scrape_articles_async(rss_items, on_article))
+
+    async def scrape_articles_async(
+        self, rss_items: List[Dict], on_article: Optional[ArticleCallback] = None
+    ) -> List[Dict]:
         self.logger.info(f"--- [步驟 2/6] 正在爬取 {len(rss_items)} 則新聞內容...")
-        articles = []
-        with ThreadPoolExecutor(max_workers=self.config.MAX_WORKERS) as executor:
-            future_to_item = {
-                executor.submit(self._scrape_single_article, item): item
-                for item in rss_items
-            }
-            for future in as_completed(future_to_item):
-                item = future_to_item[future]
-                try:
-                    content = future.result()
-                    if not content:
-                        content = item.get("description") or ""
-                        if content:
-                            self.logger.info(f"使用 RSS 摘要 {item['url']} 作為內容")
-                        else:
-                            self.logger.warning(f"RSS 摘要為空,跳過: {item['url']}")
-                            continue
-                    articles.append(
-                        {
-                            "title": item["title"],
-                            "url": item["url"],
-                            "content": content,
-                            "source_domain": item["source_domain"],
-                            "source_name": item.get("source_name"),
-                        }
-                    )
-                except Exception as e:
-                    self.logger.error(f"爬取失敗: {item.get('url', '')} - {e}")
+        if self.config.PAGE_CACHE_OFFLINE:
+            self.logger.info("🗄️ 離線模式: 只從網頁快取重新擷取內容,不連線下載")
+        else:
+            await self._start_browser_pool()
+        self._http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.config.SCRAPE_TIMEOUT)
+        )
+        self._domain_semaphores = {}
+        in_flight = asyncio.Semaphore(max(1, self.config.MAX_WORKERS))
+        completed = 0
+
+        async def scrape(item: Dict) -> Optional[Dict]:
+            nonlocal completed
+            article = await self._scrape_item(item, in_flight)
+            completed += 1
+            if on_article:
+                on_article(item, article, completed, len(rss_items))
+            return article
+
+        try:
+            results = await asyncio.gather(*(scrape(item) for item in rss_items))
+        finally:
+            await self._http_session.close()
+            self._http_session = None
+            await self._stop_browser_pool()
+            self.strategy_stats.save()
+            if self.page_cache:
+                self.page_cache.log_stats()
+        articles = [article for article in results if article]
         self.logger.info(f"爬取完成,獲取 {len(articles)} 則新聞內容")
         return articles
 
-    def _scrape_single_article(self, article: Dict[str, str]) -> Optional[str]:
+    async def _scrape_item(
+        self, item: Dict, in_flight: asyncio.Semaphore
+    ) -> Optional[Dict]:
+        domain = urlparse(item.get("url", "")).netloc or item.get("source_domain", "")
+        domain_semaphore = self._domain_semaphores.setdefault(
+            domain, asyncio.Semaphore(max(1, self.config.CRAWL_PER_DOMAIN_CONCURRENCY))
+        )
+        try:
+            # 先取得網域名額再佔用全域名額，避免同一網域排隊的工作卡住全域名額
+            async with domain_semaphore, in_flight:
+                content = await self._scrape_single_article(item)
+            if not content:
+                content = item.get("description") or ""
+                if content:
+                    self.logger.info(f"使用 RSS 摘要 {item['url']} 作為內容")
+                else:
+                    self.logger.warning(f"RSS 摘要為空,跳過: {item['url']}")
+                    return None
+            return {
+                "title": item["title"],
+                "url": item["url"],
+                "content": content,
+                "source_domain": item["source_domain"],
+                "source_name": item.get("source_name"),
+            }
+        except Exception as e:
+            self.logger.error(f"爬取失敗: {item.get('url', '')} - {e}")
+            return None
+
+    async def _scrape_single_article(self, article: Dict[str, str]) -> Optional[str]:
         url = article.get("url", "")
         source_domain = article.get("source_domain", "")
         self.logger.debug(f"嘗試爬取: {url}")
 
-        if "bloomberg.com" in source_domain:
-            try:
-                text = self._crawl_with_crawl4ai_with_retry(url, max_retries=2)
-                if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                    self.logger.info(f"Bloomberg 使用 crawl4ai 成功: {url}")
-                    return self._clean_control_characters(self._clean_text(text))
-            except Exception as e:
-                self.logger.warning(f"Bloomberg crawl4ai 爬取失敗: {url} - {e}")
+        chain = self._strategy_chain(source_domain)
+        if self.page_cache:
+            text = await self._scrape_from_cache(url, source_domain, chain)
+            if text or self.config.PAGE_CACHE_OFFLINE:
+                return text
 
-            try:
-                text = self._scrape_with_enhanced_headers(url, source_domain)
-                if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                    self.logger.info(f"Bloomberg 使用改進請求頭成功: {url}")
-                    return self._clean_control_characters(self._clean_text(text))
-            except Exception as e:
-                self.logger.warning(f"Bloomberg 改進請求頭爬取失敗: {url} - {e}")
-
-            if self.config.TAVILY_API_KEY:
-                try:
-                    text = self._scrape_with_tavily(url)
-                    if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                        self.logger.info(f"Bloomberg 使用 Tavily 成功: {url}")
-                        return self._clean_control_characters(self._clean_text(text))
-                except Exception as e:
-                    self.logger.warning(f"Bloomberg Tavily 爬取失敗: {url} - {e}")
-            return None
+        host = self.rate_limiter.key_for(url)
+        for strategy in self.strategy_stats.order(host, chain):
+            text = await self._run_strategy(strategy, url, source_domain, host)
+            if text:
+                return text
+        return None
 
-        if "cnn.com" in source_domain and self.config.TAVILY_API_KEY:
-            try:
-                text = self._scrape_with_tavily(url)
-                if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                    return self._clean_control_characters(self._clean_text(text))
-            except Exception as e:
-                self.logger.warning(f"Tavily 爬取失敗: {url} - {e}")
+    def _strategy_chain(self, source_domain: str) -> List[str]:
+        """依網域決定預設的爬取策略順序，實際順序再由 CrawlStrategyStats 依歷史紀錄調整"""
+        if "bloomberg.com" in source_domain:
+            chain = ["crawl4ai", "enhanced_headers", "tavily"]
+        elif "cnn.com" in source_domain:
+            chain = ["tavily", "crawl4ai", "beautifulsoup"]
+        else:
+            chain = ["crawl4ai", "beautifulsoup"]
+        if not self.config.TAVILY_API_KEY:
+            chain = [strategy for strategy in chain if strategy != "tavily"]
+        return chain
+
+    async def _scrape_from_cache(
+        self, url: str, source_domain: str, chain: List[str]
+    ) -> Optional[str]:
+        """依策略順序查詢網頁快取，HTML 會以目前的擷取邏輯重新解析"""
+        for kind in dict.fromkeys(STRATEGY_CACHE_KINDS[strategy] for strategy in chain):
+            cached = self.page_cache.get(url, kind)
+            if cached is None:
+                continue
+            if kind == "html":
+                cached = await asyncio.to_thread(
+                    self._extract_article_text, cached, source_domain
+                )
+            if cached and len(cached) > self.config.ARTICLE_MIN_LENGTH:
+                metrics.incr("page_cache_hits_total", kind=kind)
+                self.logger.info(f"🗄️ 使用網頁快取 ({kind}): {url}")
+                return self._clean_control_characters(self._clean_text(cached))
+        return None
 
+    async def _run_strategy(
+        self, strategy: str, url: str, source_domain: str, host: str
+    ) -> Optional[str]:
+        """執行單一爬取策略並記錄耗時與成敗，內容太短視為失敗"""
+        started = time.perf_counter()
+        text = None
         try:
-            text = self._crawl_with_crawl4ai_with_retry(url, max_retries=2)
-            if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                return self._clean_control_characters(self._clean_text(text))
+            if strategy == "crawl4ai":
+                text = await self._crawl_with_crawl4ai_with_retry(url, max_retries=2)
+            elif strategy == "enhanced_headers":
+                text = await self._scrape_with_enhanced_headers(url, source_domain)
+            elif strategy == "tavily":
+                text = await self._scrape_with_tavily(url)
+            elif strategy == "beautifulsoup":
+                text = await self._scrape_with_beautifulsoup(url, source_domain)
         except Exception as e:
-            self.logger.warning(f"crawl4ai 爬取失敗: {url} - {e}")
+            self.logger.warning(f"{STRATEGY_LABELS[strategy]} 爬取失敗: {url} - {e}")
+        succeeded = bool(text and len(text) > self.config.ARTICLE_MIN_LENGTH)
+        elapsed = time.perf_counter() - started
+        self.strategy_stats.record(host, strategy, succeeded, elapsed)
+        metrics.observe(
+            "crawl_strategy",
+            elapsed,
+            strategy=strategy,
+            outcome="success" if succeeded else "failure",
+        )
+        if not succeeded:
+            return None
+        self.logger.info(f"使用 {STRATEGY_LABELS[strategy]} 成功: {url}")
+        return self._clean_control_characters(self._clean_text(text))
+
+    async def _start_browser_pool(self) -> None:
+        """在目前的 event loop 中啟動共用瀏覽器，供所有文章爬取使用"""
+        try:
+            browser_config, crawler_config = self._get_crawl4ai_config()
+        except ImportError:
+            self.logger.debug("crawl4ai 未安裝,使用備用方法")
+            return
 
+        pool = BrowserPool(self.config, self.logger, browser_config, crawler_config)
         try:
-            text = self._scrape_with_beautifulsoup(url, source_domain)
-            if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
-                return self._clean_control_characters(self._clean_text(text))
+            await pool.start()
         except Exception as e:
-            self.logger.warning(f"BeautifulSoup 爬取失敗: {url} - {e}")
-        return None
+            self.logger.warning(f"crawl4ai 瀏覽器啟動失敗,改為每篇文章獨立啟動: {e}")
+            return
+        self._browser_pool = pool
+
+    async def _stop_browser_pool(self) -> None:
+        if self._browser_pool is None:
+            return
+        pool, self._browser_pool = self._browser_pool, None
+        await pool.close()
 
     def _get_crawl4ai_config(self):
         """獲取 crawl4ai 的優化配置"""
@@ -128,39 +245,39 @@ class NewsCrawler:
 
         return browser_config, crawler_config
 
-    def _crawl_with_crawl4ai_with_retry(
+    async def _crawl_with_crawl4ai_with_retry(
         self, url: str, max_retries: int = 3
     ) -> Optional[str]:
         """使用 crawl4ai 爬取，支援重試"""
-        from crawl4ai import AsyncWebCrawler
-        import asyncio
-        import time
-
-        browser_config, crawler_config = self._get_crawl4ai_config()
-
         for attempt in range(1, max_retries + 1):
             try:
+                await self.rate_limiter.aacquire(url)
+                if self._browser_pool is not None:
+                    # 共用瀏覽器：在同一個 event loop 中開新分頁
+                    text = await self._browser_pool.fetch_markdown(url)
+                else:
+                    from crawl4ai import AsyncWebCrawler
 
-                async def fetch():
+                    browser_config, crawler_config = self._get_crawl4ai_config()
                     async with AsyncWebCrawler(
                         config=browser_config, verbose=False
                     ) as crawler:
                         result = await crawler.arun(url=url, config=crawler_config)
-                        return result.markdown if result and result.markdown else None
-
-                text = asyncio.run(fetch())
+                        text = result.markdown if result and result.markdown else None
 
                 if text and len(text) > self.config.ARTICLE_MIN_LENGTH:
                     self.logger.info(
                         f"crawl4ai 成功 (嘗試 {attempt}/{max_retries}): {url[:60]}..."
                     )
+                    if self.page_cache:
+                        self.page_cache.put(url, "markdown", text)
                     return text
                 elif text:
                     self.logger.warning(
                         f"crawl4ai 內容較短 (嘗試 {attempt}/{max_retries}): {len(text)} 字符"
                     )
                     if attempt < max_retries:
-                        time.sleep(2)
+                        await asyncio.sleep(2)
                         continue
                     return text
                 else:
@@ -168,7 +285,7 @@ class NewsCrawler:
                         f"crawl4ai 返回空內容 (嘗試 {attempt}/{max_retries})"
                     )
                     if attempt < max_retries:
-                        time.sleep(2)
+                        await asyncio.sleep(2)
                         continue
                     return None
 
@@ -188,18 +305,18 @@ class NewsCrawler:
 
                 if attempt < max_retries:
                     self.logger.info("等待 3 秒後重試...")
-                    time.sleep(3)
+                    await asyncio.sleep(3)
                     continue
                 return None
 
         self.logger.error(f"crawl4ai 在 {max_retries} 次重試後仍然失敗: {url}")
         return None
 
-    def _crawl_with_crawl4ai(self, url: str) -> Optional[str]:
+    async def _crawl_with_crawl4ai(self, url: str) -> Optional[str]:
         """使用 crawl4ai 爬取（內部方法，重試邏輯已移至 _crawl_with_crawl4ai_with_retry）"""
-        return self._crawl_with_crawl4ai_with_retry(url, max_retries=3)
+        return await self._crawl_with_crawl4ai_with_retry(url, max_retries=3)
 
-    def _scrape_with_tavily(self, url: str) -> Optional[str]:
+    async def _scrape_with_tavily(self, url: str) -> Optional[str]:
         try:
             tavily_api_url = "https://api.tavily.com/search"
             payload = {
@@ -209,19 +326,23 @@ class NewsCrawler:
                 "include_raw_content": True,
                 "max_results": 1,
             }
-            response = requests.post(
-                tavily_api_url, json=payload, timeout=self.config.SCRAPE_TIMEOUT
-            )
-            response.raise_for_status()
-            data = response.json()
+            await self.rate_limiter.aacquire(tavily_api_url)
+            async with self._http_session.post(
+                tavily_api_url, json=payload
+            ) as response:
+                self._record_response(tavily_api_url, response)
+                response.raise_for_status()
+                data = await response.json(content_type=None)
             if data.get("results") and len(data["results"]) > 0:
                 content = data["results"][0].get("content", "")
+                if self.page_cache:
+                    self.page_cache.put(url, "tavily", content)
                 return content
         except Exception as e:
             self.logger.warning(f"Tavily API 呼叫失敗: {url} - {e}")
         return None
 
-    def _scrape_with_enhanced_headers(
+    async def _scrape_with_enhanced_headers(
         self, url: str, source_domain: str
     ) -> Optional[str]:
         enhanced_headers = {
@@ -238,13 +359,33 @@ class NewsCrawler:
             "Cache-Control": "max-age=0",
             "Referer": "https://www.bloomberg.com/",
         }
+        html = await self._fetch_html(url, enhanced_headers)
+        # HTML 解析屬於 CPU 工作，移到執行緒中避免阻塞 event loop
+        return await asyncio.to_thread(self._extract_article_text, html, source_domain)
 
-        res = requests.get(
-            url, headers=enhanced_headers, timeout=self.config.SCRAPE_TIMEOUT
+    async def _scrape_with_beautifulsoup(
+        self, url: str, source_domain: str
+    ) -> Optional[str]:
+        html = await self._fetch_html(url, self.config.RSS_REQUEST_HEADERS)
+        return await asyncio.to_thread(self._extract_article_text, html, source_domain)
+
+    async def _fetch_html(self, url: str, headers: Dict[str, str]) -> str:
+        await self.rate_limiter.aacquire(url)
+        async with self._http_session.get(url, headers=headers) as res:
+            self._record_response(url, res)
+            res.raise_for_status()
+            html = await res.text(errors="replace")
+        if self.page_cache:
+            self.page_cache.put(url, "html", html)
+        return html
+
+    def _record_response(self, url: str, res: aiohttp.ClientResponse) -> None:
+        self.rate_limiter.record_response(
+            url, res.status, parse_retry_after(res.headers)
         )
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
 
+    def _extract_article_text(self, html: str, source_domain: str) -> Optional[str]:
+        soup = BeautifulSoup(html, "html.parser")
         if "bloomberg.com" in source_domain:
             text = self._extract_bloomberg_text(soup)
         elif "cnbc.com" in source_domain:
@@ -260,24 +401,6 @@ class NewsCrawler:
                 text = body_tag.get_text(separator=" ", strip=True) if body_tag else ""
         return text
 
-    def _scrape_with_beautifulsoup(self, url: str, source_domain: str) -> Optional[str]:
-        headers = self.config.RSS_REQUEST_HEADERS
-        res = requests.get(url, headers=headers, timeout=self.config.SCRAPE_TIMEOUT)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        if "cnbc.com" in source_domain:
-            text = self._extract_cnbc_text(soup)
-        elif "cnn.com" in source_domain:
-            text = self._extract_cnn_business_text(soup)
-        else:
-            article_tag = soup.find("article")
-            if article_tag:
-                text = article_tag.get_text(separator=" ", strip=True)
-            else:
-                body_tag = soup.find("body")
-                text = body_tag.get_text(separator=" ", strip=True) if body_tag else ""
-        return text
-
     def _extract_cnbc_text(self, soup: BeautifulSoup) -> Optional[str]:
         selectors = [
             "div.ArticleBody-articleBody",
@@ -0,0 +1,104 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..core.config import Config
+from .seen_index import normalize_url
+
+# 離線重播時使用的新聞列表快照鍵值
+_DISCOVERY_KEY = "discovery://latest"
+
+
+class PageCache:
+    """以 (網址, 種類) 為鍵、gzip 壓縮的網頁內容磁碟快取；離線模式下不檢查新鮮度"""
+
+    KINDS = ("html", "markdown", "tavily", "discovery")
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.root = self.config.CACHE_DIR / "pages"
+        self.offline = self.config.PAGE_CACHE_OFFLINE
+        self.ttl_seconds = self.config.PAGE_CACHE_TTL_HOURS * 3600
+        self.hits = 0
+        self.misses = 0
+        for kind in self.KINDS:
+            (self.root / kind).mkdir(parents=True, exist_ok=True)
+        if not self.offline:
+            self._prune()
+
+    def get(self, url: str, kind: str) -> Optional[str]:
+        path = self._path(url, kind)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if not self.offline and age > self.ttl_seconds:
+                self.misses += 1
+                return None
+            text = gzip.decompress(path.read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            self.logger.warning(f"讀取網頁快取失敗: {url} - {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, url: str, kind: str, text: str) -> None:
+        if self.offline or not text:
+            return
+        path = self._path(url, kind)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(text.encode("utf-8"), compresslevel=6))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"寫入網頁快取失敗: {url} - {e}")
+
+    def save_discovery(self, items: List[Dict[str, str]]) -> None:
+        """保存最近一次的新聞列表，供 --offline 重播同一批新聞"""
+        self.put(_DISCOVERY_KEY, "discovery", json.dumps(items, ensure_ascii=False))
+
+    def load_discovery(self) -> List[Dict[str, str]]:
+        cached = self.get(_DISCOVERY_KEY, "discovery")
+        if cached is None:
+            return []
+        try:
+            return json.loads(cached)
+        except ValueError as e:
+            self.logger.warning(f"新聞列表快照損毀: {e}")
+            return []
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        if not total:
+            return
+        self.logger.info(
+            f"🗄️ 網頁快取統計: 命中 {self.hits} / 未命中 {self.misses}"
+            f" (命中率 {self.hits / total * 100:.1f}%)"
+        )
+
+    def _path(self, url: str, kind: str) -> Path:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.root / kind / f"{digest}.gz"
+
+    def _prune(self) -> None:
+        """刪除超過保留天數的快取檔，避免目錄無限成長"""
+        expire_before = time.time() - self.config.PAGE_CACHE_RETENTION_DAYS * 86400
+        removed = 0
+        for path in self.root.glob("*/*.gz"):
+            try:
+                if path.stat().st_mtime < expire_before:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            self.logger.debug(f"已清除 {removed} 個過期網頁快取")
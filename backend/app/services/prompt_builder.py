@@ -0,0 +1,114 @@
+import re
+import math
+import logging
+from typing import Dict, List
+from ..core.config import Config
+
+# 中日韓文字與全形標點，大多數模型的 tokenizer 約每字一個 token
+_CJK_RE = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]"
+)
+# 句子結尾：英文句號／問號／驚嘆號後接空白，或中文句末標點，或換行
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])|\n+")
+TRUNCATION_MARKER = "\n\n[...後文已截斷...]"
+
+
+class PromptBuilder:
+    """依模型的 token 預算組出單篇分析提示詞，過長的內容依句子截斷"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.stats: Dict[str, int] = {
+            "articles": 0,
+            "truncated": 0,
+            "tokens_before": 0,
+            "tokens_after": 0,
+        }
+
+    def estimate_tokens(self, text: str, model_name: str) -> int:
+        if not text:
+            return 0
+        cjk_chars = len(_CJK_RE.findall(text))
+        chars_per_token = self.config.MODEL_CHARS_PER_TOKEN.get(
+            model_name, self.config.DEFAULT_CHARS_PER_TOKEN
+        )
+        return cjk_chars + math.ceil((len(text) - cjk_chars) / chars_per_token)
+
+    def input_budget(self, model_name: str) -> int:
+        context = self.config.MODEL_CONTEXT_TOKENS.get(
+            model_name, self.config.DEFAULT_MODEL_CONTEXT_TOKENS
+        )
+        return max(
+            0,
+            min(
+                self.config.PROMPT_INPUT_TOKEN_BUDGET,
+                context - self.config.OPENROUTER_MAX_TOKENS,
+            ),
+        )
+
+    def build_article_prompt(
+        self, article: Dict, source_display_name: str, model_name: str
+    ) -> str:
+        """組出 SINGLE_ARTICLE_ANALYSIS_PROMPT，並確保估計 token 數不超過預算"""
+
+        def render(content: str) -> str:
+            return self.config.SINGLE_ARTICLE_ANALYSIS_PROMPT.format(
+                news_content=self.config.RAW_NEWS_MARKDOWN_TEMPLATE.format(
+                    title=article["title"],
+                    source_display_name=source_display_name,
+                    url=article["url"],
+                    content=content,
+                )
+            )
+
+        content = article["content"]
+        tokens_before = self.estimate_tokens(content, model_name)
+        content_budget = self.input_budget(model_name) - self.estimate_tokens(
+            render(""), model_name
+        )
+        fitted = content
+        if tokens_before > content_budget:
+            fitted = self._truncate_to_sentences(content, content_budget, model_name)
+        tokens_after = self.estimate_tokens(fitted, model_name)
+
+        self.stats["articles"] += 1
+        self.stats["tokens_before"] += tokens_before
+        self.stats["tokens_after"] += tokens_after
+        if fitted != content:
+            self.stats["truncated"] += 1
+            self.logger.info(
+                f"✂️ 內容超過預算，已精簡: 約 {tokens_before} → {tokens_after} tokens"
+                f"（{len(content)} → {len(fitted)} 字元）"
+            )
+        else:
+            self.logger.debug(f"提示詞內容約 {tokens_after} tokens，未超過預算")
+        return render(fitted)
+
+    def log_stats(self) -> None:
+        if not self.stats["articles"]:
+            return
+        self.logger.info(
+            f"📏 提示詞內容: {self.stats['articles']} 篇，其中 {self.stats['truncated']} 篇經精簡，"
+            f"約 {self.stats['tokens_before']} → {self.stats['tokens_after']} tokens"
+        )
+
+    def _truncate_to_sentences(self, text: str, budget: int, model_name: str) -> str:
+        """保留開頭的完整句子直到用完預算，新聞重點通常在前段"""
+        budget -= self.estimate_tokens(TRUNCATION_MARKER, model_name)
+        kept: List[str] = []
+        used = 0
+        position = 0
+        for match in _SENTENCE_END_RE.finditer(text + "\n"):
+            sentence = text[position : match.end()]
+            cost = self.estimate_tokens(sentence, model_name)
+            if used + cost > budget:
+                break
+            kept.append(sentence)
+            used += cost
+            position = match.end()
+        if not kept:
+            # 第一句就超過預算時，直接依估計的字元數截斷
+            ratio = budget / max(1, self.estimate_tokens(text, model_name))
+            kept.append(text[: max(0, int(len(text) * ratio))])
+        return "".join(kept).rstrip() + TRUNCATION_MARKER
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlsplit
+from ..core.config import Config
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """從 Retry-After（秒數或 HTTP 日期）或 X-RateLimit-Reset（毫秒時間戳）取得需等待的秒數"""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(
+                    0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()
+                )
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) / 1000 - time.time())
+        except ValueError:
+            pass
+    return None
+
+
+@dataclass
+class _Bucket:
+    rate: float
+    max_rate: float
+    capacity: float
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+
+
+class RateLimiter:
+    """以主機為單位的 token bucket，執行緒與 asyncio 共用；遇到 429 時依 AIMD 自動調降速率"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def acquire(self, url: str) -> None:
+        """同步版本：在執行緒中等待到可以送出請求"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, url: str) -> None:
+        """非同步版本：等待期間不阻塞 event loop"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record_response(
+        self, url: str, status: int, retry_after: Optional[float] = None
+    ) -> None:
+        """429 時速率減半並依 Retry-After 暫停該主機；其他回應則逐步恢復速率"""
+        key = self.key_for(url)
+        with self._lock:
+            bucket = self._bucket(key)
+            if status != 429:
+                if bucket.rate < bucket.max_rate:
+                    bucket.rate = min(
+                        bucket.max_rate,
+                        bucket.rate
+                        + bucket.max_rate * self.config.RATE_LIMIT_RECOVERY_STEP,
+                    )
+                return
+            bucket.rate = max(self.config.RATE_LIMIT_MIN_RATE, bucket.rate / 2)
+            if retry_after:
+                bucket.blocked_until = max(
+                    bucket.blocked_until, time.monotonic() + retry_after
+                )
+            new_rate = bucket.rate
+        message = f"🚦 {key} 回應 429，速率調降為每秒 {new_rate:.2f} 次"
+        if retry_after:
+            message += f"，暫停 {retry_after:.0f} 秒"
+        self.logger.warning(message)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        host = (urlsplit(url).hostname or url).lower()
+        return host[len("www.") :] if host.startswith("www.") else host
+
+    def _reserve(self, url: str) -> float:
+        """預先扣除一個 token，回傳需要等待的秒數（不足的 token 以等待時間償還）"""
+        key = self.key_for(url)
+        with self._lock:
+            bucket = self._bucket(key)
+            now = time.monotonic()
+            bucket.tokens = min(
+                bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate
+            )
+            bucket.updated = now
+            bucket.tokens -= 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            wait = max(wait, bucket.blocked_until - now)
+        if wait > 1:
+            self.logger.debug(f"🚦 {key} 限流中，等待 {wait:.1f} 秒")
+        return wait
+
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.config.RATE_LIMITS.get(key, self.config.DEFAULT_HOST_RATE)
+            capacity = max(1.0, float(self.config.RATE_LIMIT_BURST))
+            bucket = _Bucket(
+                rate=rate,
+                max_rate=rate,
+                capacity=capacity,
+                tokens=capacity,
+                updated=time.monotonic(),
+            )
+            self._buckets[key] = bucket
+        return bucket
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter(config: Config, logger: logging.Logger) -> RateLimiter:
+    """取得整個行程共用的 RateLimiter，讓所有服務對同一主機共享配額"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(config, logger)
+        return _shared_limiter
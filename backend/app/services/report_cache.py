@@ -0,0 +1,120 @@
+import gzip
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+from ..core.config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass
+class CachedReport:
+    generation: str
+    mtime_ns: int
+    size: int
+    last_update: str
+    # 內容編碼 → 預先壓縮好的內容；"identity" 為原始 HTML
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: str) -> str:
+        # 不同內容編碼是不同的表示法，強 ETag 需要各自不同
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.generation}{suffix}"'
+
+
+class ReportCache:
+    """把 HTML 報告與預先壓縮的 gzip／brotli 版本保存在記憶體，檔案的 mtime 或大小改變時才重新讀取"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.HTML_OUTPUT_PATH / self.config.HTML_FILENAME
+        self._lock = threading.Lock()
+        self._report: Optional[CachedReport] = None
+        self._checked_at = 0.0
+
+    def get(self) -> Optional[CachedReport]:
+        """回傳目前的報告；最多每 REPORT_CACHE_CHECK_INTERVAL 秒檢查一次檔案是否更新"""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._report is not None
+                and now - self._checked_at < self.config.REPORT_CACHE_CHECK_INTERVAL
+            ):
+                return self._report
+            self._checked_at = now
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._report = None
+                return None
+            report = self._report
+            if report is None or (report.mtime_ns, report.size) != (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                self._report = self._load(stat.st_mtime_ns, stat.st_size)
+            return self._report
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """依 Accept-Encoding 選擇已預先壓縮的版本，優先 brotli"""
+        accepted = self._parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding == "br" and brotli is None:
+                continue
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    @staticmethod
+    def etag_matches(if_none_match: str, etag: str) -> bool:
+        """If-None-Match 使用弱比較：忽略 W/ 前綴，"*" 比對任何版本"""
+        candidates = [
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        ]
+        return "*" in candidates or etag in candidates
+
+    def _load(self, mtime_ns: int, size: int) -> Optional[CachedReport]:
+        try:
+            body = self.path.read_bytes()
+        except OSError as e:
+            self.logger.warning(f"讀取 HTML 報告失敗: {e}")
+            return None
+        report = CachedReport(
+            generation=hashlib.sha256(body).hexdigest()[:32],
+            mtime_ns=mtime_ns,
+            size=size,
+            last_update=datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+            bodies={"identity": body, "gzip": gzip.compress(body, compresslevel=9)},
+        )
+        if brotli is not None:
+            report.bodies["br"] = brotli.compress(body, quality=11)
+        self.logger.info(
+            f"📄 已載入報告 {report.generation[:12]}: {len(body)} bytes,"
+            f" gzip {len(report.bodies['gzip'])} bytes"
+        )
+        return report
+
+    @staticmethod
+    def _parse_accept_encoding(header: str) -> Dict[str, float]:
+        accepted: Dict[str, float] = {}
+        for part in (header or "").split(","):
+            name, _, params = part.strip().partition(";")
+            if not name:
+                continue
+            quality = 1.0
+            key, _, value = params.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        return accepted
@@ -0,0 +1,122 @@
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional
+from ..core.config import Config
+
+
+class ResponseCache:
+    """以 (model, prompt) 雜湊為鍵的 LLM 回應磁碟快取，支援 TTL 與容量上限淘汰"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.CACHE_DIR / "llm_responses.sqlite3"
+        self.ttl_seconds = self.config.LLM_CACHE_TTL_HOURS * 3600
+        self.max_bytes = self.config.LLM_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access"
+                " ON responses (last_access)"
+            )
+        self._evict()
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE responses SET last_access = ? WHERE key = ?",
+                        (now, key),
+                    )
+                self.hits += 1
+                self.logger.info(f"💾 LLM 快取命中: {model_name} ({key[:12]})")
+                return row[0]
+            self.misses += 1
+        return None
+
+    def set(self, model_name: str, prompt: str, response: str) -> None:
+        key = self.make_key(model_name, prompt)
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses"
+                    " (key, model, response, size, created_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        model_name,
+                        response,
+                        len(response.encode("utf-8")),
+                        now,
+                        now,
+                    ),
+                )
+            self._evict()
+        except sqlite3.Error as e:
+            self.logger.warning(f"寫入 LLM 快取失敗: {e}")
+
+    def _evict(self) -> None:
+        """先刪除過期項目，再依最近存取時間淘汰到容量上限以下"""
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            ).rowcount
+            total_size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            evicted = 0
+            if total_size > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access"
+                ).fetchall()
+                stale_keys = []
+                for key, size in rows:
+                    if total_size <= self.max_bytes:
+                        break
+                    stale_keys.append((key,))
+                    total_size -= size
+                self._conn.executemany(
+                    "DELETE FROM responses WHERE key = ?", stale_keys
+                )
+                evicted = len(stale_keys)
+            self.evictions += expired + evicted
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        self.logger.info(
+            f"💾 LLM 快取統計: 命中 {self.hits} / 未命中 {self.misses}"
+            f" (命中率 {hit_rate:.1f}%), 淘汰 {self.evictions} 筆"
+        )
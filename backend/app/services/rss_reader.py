@@ -1,64 +1,112 @@
 import requests
 import xml.etree.ElementTree as ET
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from ..core.config import Config
+from .feed_cache import FeedValidatorCache
+from .seen_index import SeenURLIndex, normalize_url
+from .rate_limiter import get_rate_limiter, parse_retry_after
 
 
 class RSSReader:
-    def __init__(self, config: Config, logger: logging.Logger):
+    def __init__(
+        self,
+        config: Config,
+        logger: logging.Logger,
+        seen_index: Optional[SeenURLIndex] = None,
+    ):
         self.config = config
         self.logger = logger
+        self.seen_index = seen_index
+        # 最近一次獲取時因先前報告已處理過而略過的新聞數
+        self.skipped_seen = 0
+        self.feed_cache = (
+            FeedValidatorCache(config, logger)
+            if self.config.RSS_CONDITIONAL_GET
+            else None
+        )
+        self.rate_limiter = get_rate_limiter(config, logger)
 
     def fetch_all_rss(self) -> List[Dict[str, str]]:
         self.logger.info("--- [步驟 1/6] 從多個新聞來源獲取新聞列表...")
-        items: List[Dict[str, str]] = []
-
-        # CNBC RSS (保持使用 RSS)
-        for feed_url in self.config.CNBC_RSS_URLS:
-            items.extend(
-                self._fetch_rss(feed_url, "CNBC", self.config.MAX_ARTICLES_PER_SOURCE)
-            )
-
-        # 使用 Tavily 搜尋其他網站的新聞
-        items.extend(
-            self._search_with_tavily(
-                "Bloomberg", "bloomberg.com", self.config.MAX_ARTICLES_PER_SOURCE
-            )
-        )
-        items.extend(
-            self._search_with_tavily(
-                "Fortune", "fortune.com", self.config.MAX_ARTICLES_PER_SOURCE
-            )
-        )
-        items.extend(
-            self._search_with_tavily(
+        limit = self.config.MAX_ARTICLES_PER_SOURCE
+        # 來源順序即合併與去重的優先順序
+        sources = [
+            # CNBC RSS (保持使用 RSS)
+            *(
+                (
+                    f"CNBC RSS ({feed_url})",
+                    partial(self._fetch_rss, feed_url, "CNBC", limit),
+                )
+                for feed_url in self.config.CNBC_RSS_URLS
+            ),
+            # 使用 Tavily 搜尋其他網站的新聞
+            (
+                "Bloomberg",
+                partial(self._search_with_tavily, "Bloomberg", "bloomberg.com", limit),
+            ),
+            (
+                "Fortune",
+                partial(self._search_with_tavily, "Fortune", "fortune.com", limit),
+            ),
+            (
                 "Yahoo Finance",
-                "finance.yahoo.com",
-                self.config.MAX_ARTICLES_PER_SOURCE,
-            )
-        )
-        items.extend(
-            self._search_with_tavily(
-                "MarketWatch", "marketwatch.com", self.config.MAX_ARTICLES_PER_SOURCE
-            )
-        )
+                partial(
+                    self._search_with_tavily,
+                    "Yahoo Finance",
+                    "finance.yahoo.com",
+                    limit,
+                ),
+            ),
+            (
+                "MarketWatch",
+                partial(
+                    self._search_with_tavily, "MarketWatch", "marketwatch.com", limit
+                ),
+            ),
+            # CNN Business (網頁爬取)
+            ("CNN Business", partial(self._fetch_cnn_web_articles, limit)),
+        ]
 
-        # CNN Business (網頁爬取)
-        cnn_web_items = self._fetch_cnn_web_articles(
-            self.config.MAX_ARTICLES_PER_SOURCE
+        items: List[Dict[str, str]] = []
+        executor = ThreadPoolExecutor(
+            max_workers=len(sources), thread_name_prefix="discovery"
         )
-        items.extend(cnn_web_items)
+        try:
+            futures = [executor.submit(fetch) for _, fetch in sources]
+            done, _ = wait(futures, timeout=self.config.DISCOVERY_DEADLINE)
+            for (source_name, _), future in zip(sources, futures):
+                if future not in done:
+                    self.logger.warning(
+                        f"{source_name} 超過 {self.config.DISCOVERY_DEADLINE} 秒未回應,略過"
+                    )
+                    continue
+                try:
+                    items.extend(future.result())
+                except Exception as e:
+                    self.logger.warning(f"從 {source_name} 獲取失敗: {e}")
+        finally:
+            # 不等待逾時的來源，讓整體延遲取決於最慢的來源或截止時間
+            executor.shutdown(wait=False, cancel_futures=True)
+
         deduped: List[Dict[str, str]] = []
         seen = set()
         for item in items:
             url = item.get("url")
-            if not url or url in seen:
+            if not url or normalize_url(url) in seen:
                 continue
-            seen.add(url)
+            seen.add(normalize_url(url))
             deduped.append(item)
+        self.skipped_seen = 0
+        if self.seen_index:
+            # 先排除先前報告已處理過的新聞，再截斷，讓名額留給新的新聞
+            unseen = self.seen_index.filter_unseen(deduped)
+            self.skipped_seen = len(deduped) - len(unseen)
+            deduped = unseen
         if self.config.MAX_TOTAL_ARTICLES > 0:
             deduped = deduped[: self.config.MAX_TOTAL_ARTICLES]
         self.logger.info(f"RSS 獲取 {len(deduped)} 則新聞")
@@ -67,11 +115,22 @@ class RSSReader:
     def _fetch_rss(
         self, feed_url: str, source_name: str, limit: int
     ) -> List[Dict[str, str]]:
-        headers = self.config.RSS_REQUEST_HEADERS
+        headers = dict(self.config.RSS_REQUEST_HEADERS)
+        if self.feed_cache:
+            validators = self.feed_cache.conditional_headers(feed_url)
+            if validators:
+                # 帶驗證資訊時不可要求 no-cache，否則部分 CDN 會忽略條件式請求
+                headers.pop("Cache-Control", None)
+                headers.pop("Pragma", None)
+                headers.update(validators)
         try:
+            self.rate_limiter.acquire(feed_url)
             res = requests.get(
                 feed_url, headers=headers, timeout=self.config.SCRAPE_TIMEOUT
             )
+            self.rate_limiter.record_response(
+                feed_url, res.status_code, parse_retry_after(res.headers)
+            )
             res.raise_for_status()
         except requests.exceptions.SSLError as e:
             if feed_url.startswith("https://"):
@@ -90,13 +149,33 @@ class RSSReader:
         except Exception as e:
             self.logger.warning(f"RSS 獲取失敗: {feed_url} - {e}")
             return []
+
+        if res.status_code == 304 and self.feed_cache:
+            cached_items = self.feed_cache.get_items(feed_url)
+            if cached_items is not None:
+                self.logger.info(f"RSS 未變更 (304),沿用上次解析結果: {feed_url}")
+                return cached_items[:limit]
+
         try:
             root = ET.fromstring(res.text)
         except Exception as e:
             self.logger.warning(f"RSS 解析失敗: {feed_url} - {e}")
             return []
+        items = self._parse_rss_items(root, source_name)
+        if self.feed_cache:
+            self.feed_cache.store(
+                feed_url,
+                res.headers.get("ETag"),
+                res.headers.get("Last-Modified"),
+                items,
+            )
+        return items[:limit]
+
+    def _parse_rss_items(
+        self, root: ET.Element, source_name: str
+    ) -> List[Dict[str, str]]:
         items: List[Dict[str, str]] = []
-        for item in root.findall(".//item")[:limit]:
+        for item in root.findall(".//item"):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pub_date = self._parse_pub_date(item.findtext("pubDate") or "")
@@ -151,9 +230,15 @@ class RSSReader:
                 "max_results": limit * 2,
                 "include_domains": [domain],
             }
+            self.rate_limiter.acquire(tavily_api_url)
             response = requests.post(
                 tavily_api_url, json=payload, timeout=self.config.SCRAPE_TIMEOUT
             )
+            self.rate_limiter.record_response(
+                tavily_api_url,
+                response.status_code,
+                parse_retry_after(response.headers),
+            )
             response.raise_for_status()
             data = response.json()
 
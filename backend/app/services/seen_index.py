@@ -0,0 +1,124 @@
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from ..core.config import Config
+
+# 追蹤用查詢參數，不影響文章內容
+TRACKING_PARAM_PREFIXES = ("utm_", "mc_", "__")
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "cmpid",
+    "src",
+    "ref",
+    "mod",
+    "taid",
+    "yptr",
+    "guccounter",
+    "guce_referrer",
+    "guce_referrer_sig",
+    ".tsrc",
+    "siteid",
+}
+
+
+def normalize_url(url: str) -> str:
+    """正規化 URL 作為比對用的鍵：忽略協定、www.、結尾斜線、fragment 與追蹤參數"""
+    parts = urlsplit((url or "").strip())
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[len("www.") :]
+    path = parts.path.rstrip("/")
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+    normalized = f"{netloc}{path}"
+    if query:
+        normalized += "?" + urlencode(sorted(query))
+    return normalized
+
+
+def content_hash(content: str) -> str:
+    """忽略大小寫與空白差異的內容雜湊"""
+    normalized = re.sub(r"\s+", " ", content or "").strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SeenURLIndex:
+    """跨次執行保存已處理過的新聞 URL 與內容雜湊，過了保留天數後自動失效"""
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.path = self.config.CACHE_DIR / "seen_urls.sqlite3"
+        self.retention_seconds = self.config.SEEN_URL_RETENTION_DAYS * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                " url_key TEXT PRIMARY KEY,"
+                " content_hash TEXT,"
+                " last_seen REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_seen_content_hash ON seen (content_hash)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen (last_seen)"
+            )
+        self.purge_expired()
+
+    def is_seen(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE url_key = ? AND last_seen >= ?",
+                (normalize_url(url), self._cutoff()),
+            ).fetchone()
+        return row is not None
+
+    def has_content(self, content: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE content_hash = ? AND last_seen >= ?",
+                (content_hash(content), self._cutoff()),
+            ).fetchone()
+        return row is not None
+
+    def filter_unseen(self, items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        unseen = [item for item in items if not self.is_seen(item.get("url", ""))]
+        skipped = len(items) - len(unseen)
+        if skipped:
+            self.logger.info(f"🗂️ 略過 {skipped} 則先前報告已處理過的新聞")
+        return unseen
+
+    def mark(self, url: str, content: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen (url_key, content_hash, last_seen)"
+                " VALUES (?, ?, ?)",
+                (
+                    normalize_url(url),
+                    content_hash(content) if content else None,
+                    time.time(),
+                ),
+            )
+
+    def purge_expired(self) -> None:
+        with self._lock, self._conn:
+            purged = self._conn.execute(
+                "DELETE FROM seen WHERE last_seen < ?", (self._cutoff(),)
+            ).rowcount
+        if purged:
+            self.logger.debug(f"已清除 {purged} 筆過期的已處理 URL")
+
+    def _cutoff(self) -> float:
+        return time.time() - self.retention_seconds
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTMLGenerator._clean_markdown_content 效能比較
+
+比較重構前（逐行比對片段清單、每行重新編譯正規表達式）與目前預先編譯版本，
+分別以 40 篇的報告與 10 倍大小的合成報告測試，並確認兩者輸出一致。
+
+執行: python bench_markdown_cleaner.py
+"""
+
+import re
+import sys
+import random
+import logging
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backend.app.core.config import Config
+from backend.app.services.html_generator import HTMLGenerator
+
+
+def legacy_clean_markdown_content(content: str) -> str:
+    """重構前的 HTMLGenerator._clean_markdown_content，作為比較基準"""
+    if not content:
+        return ""
+
+    lines = content.split("\n")
+    cleaned_lines = []
+    skip_until_empty = False
+
+    for line in lines:
+        # 跳過導航連結
+        if any(
+            skip_text in line
+            for skip_text in [
+                "[跳過導航",
+                "[CNBC]",
+                "CNBC標誌",
+                "CNBC logo",
+                "[市場]",
+                "[商業]",
+                "[投資]",
+                "[科技]",
+                "[政治]",
+                "[影片]",
+                "[觀察清單]",
+                "[投資俱樂部]",
+                "[PRO]",
+                "[Pro新聞]",
+                "[登入]",
+                "[建立免費帳戶",
+                "菜單",
+                "搜尋報價",
+                "訂閱CNBC PRO",
+                "[訂閱投資俱樂部]",
+                "[授權與轉載]",
+                "[CNBC委員會]",
+                "[選擇個人理財]",
+                "[加入CNBC小組]",
+                "[字幕]",
+                "[數位產品]",
+                "[新聞稿]",
+                "[實習]",
+                "[更正]",
+                "[關於CNBC]",
+                "[網站地圖]",
+                "[播客]",
+                "[職業]",
+                "[幫助]",
+                "[聯繫]",
+                "[聯繫我們]",
+                "#### 新聞提示",
+                "有機密新聞提示嗎",
+                "免費訂閱新聞通訊",
+                "獲取此內容發送到您的收件箱",
+                "[立即訂閱]",
+                "#### 與我們廣告合作",
+                "[請聯繫我們]",
+                "[廣告選擇]",
+                "[隱私政策]",
+                "您的隱私選擇",
+                "[加州通知]",
+                "[服務條款]",
+                "Copyright",
+                "版權所有",
+                "Versant Media",
+                "數據是實時快照",
+                "數據至少延遲",
+                "市場數據使用條款和免責聲明",
+                "路透社標誌",
+                "發布日期",
+                "重點摘要",
+                "詳細內容",
+                "延伸閱讀",
+                "專家觀點",
+                "更多",
+                "查看直播",
+                "立即觀看",
+                "觀看影片",
+                "影片:",
+                "數位原創",
+                "新聞提示",
+                "與我們廣告合作",
+                "訂閱免費新聞稿",
+                "隱私選項",
+                "加州消費者隱私法",
+            ]
+        ):
+            skip_until_empty = True
+            continue
+
+        # 如果處於跳過模式，直到遇到空行才停止
+        if skip_until_empty:
+            if line.strip() == "":
+                skip_until_empty = False
+            continue
+
+        # 跳過裝飾性圖片（CNBC logo 等）
+        if re.search(
+            r"!\[.*?(CNBC|logo|標誌|圖示|縮圖|導航|footer|header|ad|廣告|裝飾|裝飾性|decorative|icon).*?\]",
+            line,
+            re.IGNORECASE,
+        ):
+            continue
+        # 跳過小尺寸縮圖圖片
+        if re.search(r"!\[縮圖.*?\].*w=\d+&h=\d+", line):
+            continue
+
+        # 跳過純連結行（不包含文字內容的單行連結）
+        if re.match(r"^\s*\*?\s*\[.*?\]\(.*?\)\s*$", line) and len(line) < 200:
+            continue
+
+        # 跳過過長的導航欄（包含很多連結和符號的行）
+        if len(line) > 500 and "*" in line and "[" in line:
+            continue
+
+        cleaned_lines.append(line)
+
+    cleaned_content = "\n".join(cleaned_lines)
+    cleaned_content = re.sub(r"\n{3,}", "\n\n", cleaned_content)
+    cleaned_content = cleaned_content.strip()
+
+    return cleaned_content
+
+
+PARAGRAPH = (
+    "聯準會主席鮑爾週三表示，通膨雖已明顯降溫，但仍高於 2% 的目標，"
+    "市場對於年內降息的預期因此有所修正，S&P 500 指數收盤小幅下跌。"
+)
+NOISE_LINES = [
+    "[跳過導航](https://www.cnbc.com/#MainContent)",
+    "![CNBC logo](https://www.cnbc.com/logo.svg)",
+    "* [市場](https://www.cnbc.com/markets/)",
+    "[影片](https://www.cnbc.com/video/)",
+    "![縮圖 NVIDIA](https://image.cnbcfm.com/api/v1/image/1.jpg?w=160&h=90)",
+    "Copyright 2026 Versant Media. All Rights Reserved.",
+    "* [登入](https://www.cnbc.com/login) * [建立免費帳戶](https://www.cnbc.com/signup) "
+    * 12,
+]
+
+
+def build_article(rng: random.Random, index: int) -> str:
+    lines = [f"## 新聞標題 {index}", ""]
+    for _ in range(rng.randint(15, 30)):
+        if rng.random() < 0.3:
+            lines.append(rng.choice(NOISE_LINES))
+        else:
+            lines.append(PARAGRAPH * rng.randint(1, 4))
+        if rng.random() < 0.4:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def build_report(article_count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [build_article(rng, i) for i in range(1, article_count + 1)]
+
+
+def run_case(name: str, articles: list, generator: HTMLGenerator, number: int):
+    for article in articles:
+        assert generator._clean_markdown_content(
+            article
+        ) == legacy_clean_markdown_content(article), "輸出不一致"
+
+    legacy = min(
+        timeit.repeat(
+            lambda: [legacy_clean_markdown_content(a) for a in articles],
+            number=number,
+            repeat=5,
+        )
+    )
+    current = min(
+        timeit.repeat(
+            lambda: [generator._clean_markdown_content(a) for a in articles],
+            number=number,
+            repeat=5,
+        )
+    )
+    total_lines = sum(a.count("\n") + 1 for a in articles)
+    print(
+        f"{name:<24} {len(articles):>5} 篇 {total_lines:>7} 行 | "
+        f"重構前 {legacy / number * 1000:8.2f} ms | "
+        f"目前 {current / number * 1000:8.2f} ms | "
+        f"加速 {legacy / current:5.1f}x"
+    )
+
+
+def main():
+    logger = logging.getLogger("bench")
+    generator = HTMLGenerator(Config(), logger)
+    print("=" * 90)
+    print("Markdown 清理器效能比較")
+    print("=" * 90)
+    run_case("40 篇報告", build_report(40), generator, number=20)
+    run_case("10x 合成報告", build_report(400), generator, number=2)
+
+
+if __name__ == "__main__":
+    main()